@@ -0,0 +1,316 @@
+# faults.py
+"""
+장애 주입 (fault injection) — ASGI 미들웨어
+2025-08-24/rasa-fastapi/faults.py 와 같은 내용 (페이지 디렉터리끼리는 서로 import 하지 않음, 고치면 양쪽 다)
+
+요청마다 프로필의 확률대로 장애 하나를 고른다 (없으면 정상 처리):
+    hang      : hang_s 초 동안 붙잡고 있다가 처리 (클라이언트 타임아웃 유발)
+    error     : 핸들러를 부르지 않고 5xx 응답 (error_codes 중 하나)
+    reset     : 헤더만 보내고 연결을 끊음 (클라이언트는 불완전 응답 / 연결 끊김을 봄)
+    truncate  : 본문을 절반에서 잘라 보냄 (Content-Length 도 잘린 길이 → 깨진 JSON)
+    drip      : 본문을 drip_bps 바이트/초로 조금씩 흘려보냄
+    huge      : JSON 본문 끝에 "_padding" 필드로 huge_bytes 만큼 덧붙임
+truncate / huge 는 Content-Length 가 있는 응답만 본문을 모아서 고친다. 스트리밍 응답 (Content-Length 없음,
+SSE / NDJSON) 은 모으지 않고 첫 조각에만 적용: truncate 는 첫 조각 절반에서 스트림을 끝내고, huge 는 첫 조각에 padding.
+
+rng 는 응답 생성용 RNG 와 따로 주는 게 좋다 (같이 쓰면 장애를 켜는 것만으로 이후 시드 재현 응답이 전부 바뀜).
+
+스펙 문법 (콤마 구분, 앞에 기본 프로필 이름을 둘 수 있음):
+    MOCK_FAULTS="flaky"
+    MOCK_FAULTS="flaky,error=0.2,error_codes=502|503"
+    MOCK_FAULTS="hang=0.01,hang_s=45,drip=0.05,drip_bps=32"
+
+실행 중 전환: PUT /debug/faults?spec=...  (GET 은 현재 프로필 + 주입 횟수)
+MOCK_FAULTS_FILE 을 주면 스펙을 그 파일에 쓰고 모든 워커가 (최대 1초 간격으로) 따라 읽는다.
+없으면 요청을 받은 워커에만 적용된다.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException
+
+KINDS = ("hang", "error", "reset", "truncate", "drip", "huge")
+
+PROFILES: Dict[str, str] = {
+    "off": "",
+    "flaky": "error=0.05,reset=0.01,truncate=0.01",
+    "slow": "hang=0.02,drip=0.05",
+    "overloaded": "error=0.2,error_codes=503,hang=0.05",
+    "chaos": "hang=0.02,error=0.05,reset=0.02,truncate=0.02,drip=0.02,huge=0.01",
+}
+
+_PARAMS = {"hang_s": float, "drip_bps": float, "huge_bytes": int}
+
+
+class FaultReset(Exception):
+    """reset 장애: 응답 시작 후 던져서 서버가 연결을 닫게 함"""
+
+
+class FaultProfile:
+    def __init__(self, spec: str = ""):
+        self.spec = spec.strip()
+        self.rates: Dict[str, float] = {}
+        self.hang_s = 60.0
+        self.error_codes: List[int] = [500, 502, 503]
+        self.drip_bps = 64.0
+        self.huge_bytes = 5_000_000
+
+        for item in self.spec.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            if "=" not in item:
+                if item not in PROFILES:
+                    raise ValueError(f"unknown fault profile: {item!r} (known: {', '.join(PROFILES)})")
+                base = FaultProfile(PROFILES[item])
+                self.rates.update(base.rates)
+                self.hang_s, self.error_codes = base.hang_s, base.error_codes
+                self.drip_bps, self.huge_bytes = base.drip_bps, base.huge_bytes
+                continue
+            key, _, value = item.partition("=")
+            key = key.strip()
+            if key in KINDS:
+                self.rates[key] = float(value)
+            elif key == "error_codes":
+                self.error_codes = [int(c) for c in value.split("|") if c]
+            elif key in _PARAMS:
+                setattr(self, key, _PARAMS[key](value))
+            else:
+                raise ValueError(f"unknown fault option: {key!r}")
+
+        total = sum(self.rates.values())
+        if total > 1.0:
+            raise ValueError(f"fault rates add up to {total:.3f} (> 1)")
+
+    def pick(self, rng: random.Random) -> Optional[str]:
+        if not self.rates:
+            return None
+        r = rng.random()
+        for kind, p in self.rates.items():
+            if r < p:
+                return kind
+            r -= p
+        return None
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "spec": self.spec,
+            "rates": dict(self.rates),
+            "hang_s": self.hang_s,
+            "error_codes": self.error_codes,
+            "drip_bps": self.drip_bps,
+            "huge_bytes": self.huge_bytes,
+        }
+
+
+class FaultInjector:
+    def __init__(
+        self,
+        spec: str = "",
+        rng: Optional[random.Random] = None,
+        path: Optional[str] = None,
+        on_inject: Optional[Callable[[str], None]] = None,
+    ):
+        self.rng = rng or random.Random()
+        self.path = path
+        self.on_inject = on_inject
+        self.profile = FaultProfile(spec)
+        self.counts: Dict[str, int] = {k: 0 for k in KINDS}
+        self._mtime = 0.0
+        self._checked_at = 0.0
+        if path and os.path.exists(path):
+            self._reload()
+
+    @classmethod
+    def from_env(cls, rng: Optional[random.Random] = None) -> "FaultInjector":
+        return cls(os.getenv("MOCK_FAULTS", ""), rng, os.getenv("MOCK_FAULTS_FILE") or None)
+
+    def _reload(self) -> None:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if st.st_mtime == self._mtime:
+            return
+        with open(self.path, encoding="utf-8") as f:
+            spec = f.read()
+        try:
+            self.profile = FaultProfile(spec)
+        except ValueError:
+            pass  # 잘못된 파일이면 이전 프로필 유지
+        self._mtime = st.st_mtime
+
+    def set_spec(self, spec: str) -> FaultProfile:
+        profile = FaultProfile(spec)  # 잘못된 스펙이면 여기서 ValueError
+        if self.path:
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(profile.spec)
+            os.replace(tmp, self.path)
+            self._mtime = os.stat(self.path).st_mtime
+        self.profile = profile
+        return profile
+
+    def pick(self) -> Optional[str]:
+        if self.path:
+            now = time.monotonic()
+            if now - self._checked_at >= 1.0:
+                self._checked_at = now
+                self._reload()
+        kind = self.profile.pick(self.rng)
+        if kind is not None:
+            self.counts[kind] += 1
+            if self.on_inject:
+                self.on_inject(kind)
+        return kind
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.profile.describe(), "injected": dict(self.counts)}
+
+
+def _set_content_length(headers: Sequence, n: int) -> List:
+    out = [(k, v) for k, v in headers if k.lower() != b"content-length"]
+    out.append((b"content-length", str(n).encode()))
+    return out
+
+
+def _pad_json(body: bytes, n: int) -> bytes:
+    stripped = body.rstrip()
+    if not stripped.endswith(b"}"):
+        return body
+    tail = body[len(stripped):]
+    return stripped[:-1] + b',"_padding":"' + b"x" * n + b'"}' + tail
+
+
+class FaultMiddleware:
+    """paths 로 시작하는 HTTP 요청에만 장애를 주입"""
+
+    def __init__(self, app, injector: FaultInjector, paths: Sequence[str]):
+        self.app = app
+        self.injector = injector
+        self.paths = tuple(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            return await self.app(scope, receive, send)
+        kind = self.injector.pick()
+        if kind is None:
+            return await self.app(scope, receive, send)
+
+        profile = self.injector.profile
+        if kind == "hang":
+            await asyncio.sleep(profile.hang_s)
+            return await self.app(scope, receive, send)
+
+        if kind == "error":
+            status = self.injector.rng.choice(profile.error_codes)
+            body = json.dumps({"detail": "injected fault", "fault": "error", "status": status}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        if kind == "reset":
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", b"1024")],
+            })
+            raise FaultReset("injected connection reset")
+
+        if kind == "drip":
+            chunk = max(1, int(profile.drip_bps / 4))  # 0.25초마다 한 조각
+
+            async def drip_send(message):
+                if message["type"] != "http.response.body":
+                    return await send(message)
+                body = message.get("body", b"")
+                more = message.get("more_body", False)
+                for i in range(0, len(body), chunk):
+                    last = i + chunk >= len(body)
+                    await send({
+                        "type": "http.response.body",
+                        "body": body[i: i + chunk],
+                        "more_body": more or not last,
+                    })
+                    if not last:
+                        await asyncio.sleep(chunk / profile.drip_bps)
+                if not body:
+                    await send(message)
+
+            return await self.app(scope, receive, drip_send)
+
+        # truncate / huge: 길이가 정해진 응답은 본문을 모아서 고친 뒤 한 번에 보냄
+        start: Dict[str, Any] = {}
+        parts: List[bytes] = []
+        stream = {"on": False, "first": True, "ended": False}
+
+        async def buffer_send(message):
+            if stream["ended"]:
+                return  # truncate 로 이미 끝낸 스트림의 나머지 조각
+            if message["type"] == "http.response.start":
+                if not any(k.lower() == b"content-length" for k, _ in message.get("headers", [])):
+                    stream["on"] = True  # 스트리밍 → 모으지 않음
+                    return await send(message)
+                start.update(message)
+                return
+            if message["type"] != "http.response.body":
+                return await send(message)
+            if stream["on"]:
+                return await stream_send(message)
+            parts.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(parts)
+            if kind == "truncate":
+                body = body[: len(body) // 2]
+            else:
+                body = _pad_json(body, profile.huge_bytes)
+            start["headers"] = _set_content_length(start.get("headers", []), len(body))
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        async def stream_send(message):
+            body = message.get("body", b"")
+            if not body or not stream["first"]:
+                return await send(message)
+            stream["first"] = False
+            if kind == "truncate":
+                stream["ended"] = True
+                return await send({"type": "http.response.body", "body": body[: len(body) // 2], "more_body": False})
+            await send({**message, "body": _pad_json(body, profile.huge_bytes)})
+
+        return await self.app(scope, receive, buffer_send)
+
+
+class _HideFaultReset(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        exc = record.exc_info[1] if record.exc_info else None
+        return not isinstance(exc, FaultReset)
+
+
+def install_faults(app, injector: FaultInjector, paths: Sequence[str]) -> None:
+    """미들웨어 + /debug/faults 라우트 등록 (CORS 등 다른 미들웨어보다 먼저 호출하면 안쪽에 놓임)"""
+    app.add_middleware(FaultMiddleware, injector=injector, paths=paths)
+    # 주입한 reset 마다 uvicorn 이 트레이스백을 찍지 않도록
+    logging.getLogger("uvicorn.error").addFilter(_HideFaultReset())
+
+    @app.get("/debug/faults")
+    async def get_faults():
+        return injector.stats()
+
+    @app.put("/debug/faults")
+    async def put_faults(spec: str = ""):
+        try:
+            injector.set_spec(spec)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return injector.stats()
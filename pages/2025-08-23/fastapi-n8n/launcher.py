@@ -0,0 +1,69 @@
+# launcher.py
+"""
+uvicorn 실행 헬퍼 (개발 모드 / 운영 모드)
+2025-08-24/rasa-fastapi/launcher.py 와 같은 내용 (페이지 디렉터리끼리는 서로 import 하지 않음, 고치면 양쪽 다)
+
+    python main.py                  # 운영: reload 없음, 워커 3
+    python main.py --workers 4      # 운영: 멀티 워커 (코어 수만큼 권장)
+    python main.py --reload         # 개발: 파일 감시 + 자동 재시작 (워커 1 고정)
+
+uvloop / httptools 가 설치돼 있으면 자동으로 사용한다.
+    pip install uvloop httptools
+"""
+import argparse
+import importlib.util
+import os
+from typing import Callable, Optional, Sequence
+
+import uvicorn
+
+
+def best_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def best_http() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def parse_args(
+    description: str, port: int, argv: Optional[Sequence[str]] = None, workers: int = 1
+) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=port)
+    parser.add_argument("--workers", type=int, default=workers,
+                        help=f"워커 프로세스 수 (이 머신 CPU: {os.cpu_count()})")
+    parser.add_argument("--reload", action="store_true", help="개발 모드: 코드 변경 시 재시작")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--access-log", action="store_true",
+                        help="요청마다 access log 출력 (부하 테스트 시 끄는 게 좋음)")
+    return parser.parse_args(argv)
+
+
+def run(
+    app_path: str,
+    args: argparse.Namespace,
+    before_start: Optional[Callable[[int], Optional[Callable[[], None]]]] = None,
+) -> None:
+    """
+    before_start(workers) 는 워커가 뜨기 전에 부모 프로세스에서 한 번 호출된다
+    (공유 메모리 준비 등). 정리 함수를 돌려주면 서버 종료 후 호출한다.
+    """
+    workers = 1 if args.reload else max(1, args.workers)
+    cleanup = before_start(workers) if before_start else None
+    try:
+        uvicorn.run(
+            app_path,
+            host=args.host,
+            port=args.port,
+            reload=args.reload,
+            workers=workers,
+            loop=best_loop(),
+            http=best_http(),
+            log_level=args.log_level,
+            access_log=args.access_log or args.reload,
+        )
+    finally:
+        if cleanup:
+            cleanup()
@@ -1,26 +1,148 @@
 # main.py
-from fastapi import FastAPI, Query
+"""
+n8n / HTTP 클라이언트 벤치마크용 probe 서버
+
+    GET /status?delay=0.25                 # 소수 초 지연 (최대 30초)
+    GET /status?size=65536                 # 응답에 size 바이트 padding
+    GET /status?cpu_ms=50                  # CPU 작업 (스레드 풀, cpu_mode=process 면 프로세스 풀)
+    GET /status?stream=true&chunks=5       # NDJSON 으로 chunks 개를 delay 에 걸쳐 나눠 보냄
+
+모든 응답에 서버가 본 event loop 지연(loop_lag_ms: 최근 1초 최대값, instrumentation.py)을 싣는다.
+요청 로그는 QueueHandler → 백그라운드 스레드(QueueListener)가 stderr 로 쓴다 (PROBE_LOG_LEVEL).
+"""
 import asyncio
-import uvicorn
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, Query
+from fastapi.responses import StreamingResponse
+
+import launcher
+from faults import FaultInjector, install_faults
+from instrumentation import install_instrumentation
+
+MAX_DELAY_S = 30.0
+MAX_SIZE = 16 * 1024 * 1024
+MAX_CPU_MS = 10_000
+CPU_THREADS = int(os.getenv("PROBE_CPU_THREADS", str(os.cpu_count() or 2)))
+
+# ---------------------------
+# 비동기 로깅 (요청 경로는 큐에 넣기만 함)
+# ---------------------------
+log = logging.getLogger("probe")
+log.setLevel(os.getenv("PROBE_LOG_LEVEL", "INFO").upper())
+log.propagate = False
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+log.addHandler(logging.handlers.QueueHandler(_log_queue))
+_stderr = logging.StreamHandler()
+_stderr.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+LOG_LISTENER = logging.handlers.QueueListener(_log_queue, _stderr)
+
+
+# CPU 작업용 풀 (프로세스 풀은 처음 쓸 때 만든다)
+THREAD_POOL = ThreadPoolExecutor(max_workers=CPU_THREADS, thread_name_prefix="probe-cpu")
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=CPU_THREADS)
+    return _process_pool
+
 
-app = FastAPI()
+_BURN_BLOCK = os.urandom(64 * 1024)
+
+
+def burn_cpu(ms: float) -> int:
+    """ms 동안 sha256 반복 (64KB 블록이라 해시 중에는 GIL 을 놓는다). 돌린 횟수 반환"""
+    deadline = time.perf_counter() + ms / 1000.0
+    rounds = 0
+    while time.perf_counter() < deadline:
+        hashlib.sha256(_BURN_BLOCK).digest()
+        rounds += 1
+    return rounds
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    LOG_LISTENER.start()
+    try:
+        yield
+    finally:
+        THREAD_POOL.shutdown(wait=False, cancel_futures=True)
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+        LOG_LISTENER.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# /status 에 장애 주입 (MOCK_FAULTS / MOCK_FAULTS_FILE, 실행 중에는 PUT /debug/faults?spec=...)
+FAULTS = FaultInjector.from_env()
+install_faults(app, FAULTS, ["/status"])
+
+# 구간별 시간 측정 + loop lag (/debug/timings, /debug/profile)
+INSTR = install_instrumentation(app)
 
 
 @app.get("/status")
-async def status(delay: int = Query(0, ge=0, le=30)):
-    print(f"👉 Received delay param: {delay}")  # 콘솔에 출력
-    if delay > 0:
-        await asyncio.sleep(delay)
-    return {"ok": True, "msg": f"FastAPI responded after {delay} sec"}
+async def status(
+    delay: float = Query(0, ge=0, le=MAX_DELAY_S),
+    size: int = Query(0, ge=0, le=MAX_SIZE),
+    cpu_ms: float = Query(0, ge=0, le=MAX_CPU_MS),
+    cpu_mode: str = Query("thread", pattern="^(thread|process)$"),
+    stream: bool = False,
+    chunks: int = Query(5, ge=1, le=10_000),
+):
+    t0 = time.perf_counter()
+    log.info("status delay=%.3f size=%d cpu_ms=%.1f cpu_mode=%s stream=%s", delay, size, cpu_ms, cpu_mode, stream)
+
+    cpu_rounds = 0
+    if cpu_ms > 0:
+        pool = process_pool() if cpu_mode == "process" else THREAD_POOL
+        cpu_rounds = await asyncio.get_running_loop().run_in_executor(pool, burn_cpu, cpu_ms)
+
+    def report() -> dict:
+        return {
+            "delay_s": delay,
+            "cpu_ms": cpu_ms,
+            "cpu_rounds": cpu_rounds,
+            "elapsed_s": round(time.perf_counter() - t0, 4),
+            **INSTR.loop_lag.snapshot(),
+        }
+
+    if not stream:
+        if delay > 0:
+            await asyncio.sleep(delay)
+        body = {"ok": True, "msg": f"FastAPI responded after {delay:g} sec", "server": report()}
+        if size:
+            body["padding"] = "x" * size
+        return body
+
+    async def gen():
+        # delay 와 size 를 chunks 조각에 고르게 나눔
+        gap = delay / chunks
+        per_chunk = size // chunks
+        for i in range(chunks):
+            if gap > 0:
+                await asyncio.sleep(gap)
+            line = {"index": i, "padding": "x" * per_chunk} if per_chunk else {"index": i}
+            yield (json.dumps(line) + "\n").encode()
+        done = {"ok": True, "done": True, "msg": f"FastAPI streamed {chunks} chunks over {delay:g} sec", "server": report()}
+        yield (json.dumps(done) + "\n").encode()
+
+    return StreamingResponse(gen(), media_type="application/x-ndjson")
 
 
 if __name__ == "__main__":
-    # uvicorn으로 바로 실행 (포트 30916)
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8100,
-        reload=True,  # 개발 중이면 True로
-        workers=3,
-        log_level="info",
-    )
\ No newline at end of file
+    # python main.py --workers 3   (기본 포트 8100, 개발 중이면 --reload)
+    launcher.run("main:app", launcher.parse_args("FastAPI n8n status probe", 8100, workers=3))
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+로그 에러 알림 묶기 (fingerprint + 시간 창)
+
+같은 예외가 반복되면 monitor_log_file 이 줄마다 error-alert 웹훅을 보내서 n8n 실행이 수천 개 생긴다.
+AlertAggregator 는 매칭과 전송 사이에서:
+
+- 줄 → fingerprint: 타임스탬프, UUID, IP, 16진 id, 따옴표 값, 숫자를 자리표시자로 바꾼 패턴
+    "2025-08-23 10:00:01 ERROR order 18231 timeout after 30s (req=9f1c2a...)"
+    → "<TS> ERROR order <N> timeout after <N>s (req=<HEX>)"
+- (파일, 패턴) 의 첫 줄은 바로 알림 (alert="first", count=1) → 새 에러는 지연 없이 전달
+- 그 뒤 window_s 동안 같은 패턴은 개수만 셈 (창은 첫 줄 기준으로 고정, 슬라이딩 아님)
+- 창이 끝나면 반복분이 있을 때만 요약 알림 한 번 (alert="repeat"): 반복 개수, 처음/마지막 반복 시각,
+  예시 줄 (창에서 처음 반복된 줄). 창이 닫힌 뒤 다시 나오면 다시 첫 알림부터
+- 메모리 상한: 동시에 세는 패턴이 max_fingerprints 를 넘으면 가장 오래된 창을 일찍 닫아서 보냄 (버리지 않음)
+  창은 연 순서대로 OrderedDict 에 들어 있으므로 만료 확인은 앞에서부터만 보면 됨
+
+사용 예:
+    agg = AlertAggregator(lambda alert: n8n.trigger_webhook("error-alert", alert), window_s=60)
+    agg.add(line, keyword, log_path)   # 매칭된 줄마다 (새 패턴이면 여기서 바로 전송)
+    agg.tick()                         # 주기적으로 (만료된 창 전송)
+    agg.flush()                        # 종료할 때
+"""
+
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# 앞의 것이 먼저 (타임스탬프 안의 숫자가 <N> 으로 쪼개지지 않게)
+_VARIABLE_RE = re.compile(
+    r"(?P<TS>\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?"
+    r"|\d{4}[-/]\d{2}[-/]\d{2}|\b\d{2}:\d{2}:\d{2}(?:[.,]\d+)?)"
+    r"|(?P<UUID>\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b)"
+    r"|(?P<IP>\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b)"
+    r"|(?P<HEX>\b0x[0-9a-fA-F]+\b|\b(?=[0-9a-fA-F]*\d)[0-9a-fA-F]{8,}\b)"
+    r"|(?P<STR>\"[^\"]*\"|'[^']*')"
+    r"|(?P<N>\d+(?:\.\d+)?)"
+)
+_SPACES_RE = re.compile(r"\s+")
+
+
+def fingerprint(line: str) -> str:
+    """변하는 값을 자리표시자로 바꾼 패턴 문자열"""
+    pattern = _VARIABLE_RE.sub(lambda m: f"<{m.lastgroup}>", line.strip())
+    return _SPACES_RE.sub(" ", pattern)
+
+
+class _Window:
+    __slots__ = ("pattern", "log_file", "keyword", "sample", "count", "first_seen", "last_seen", "opened")
+
+    def __init__(self, pattern: str, log_file: str, keyword: str, sample: str, now: float, opened: float):
+        self.pattern = pattern
+        self.log_file = log_file
+        self.keyword = keyword
+        self.sample = sample  # 창에서 처음 반복된 줄
+        self.count = 0  # 첫 알림 뒤 반복 개수
+        self.first_seen = now
+        self.last_seen = now
+        self.opened = opened  # monotonic
+
+
+class AlertAggregator:
+    def __init__(
+        self,
+        emit: Callable[[Dict[str, Any]], Any],
+        window_s: float = 60.0,
+        max_fingerprints: int = 10000,
+        severity: str = "ERROR",
+    ):
+        self.emit = emit
+        self.window_s = window_s
+        self.max_fingerprints = max_fingerprints
+        self.severity = severity
+        self._windows: "OrderedDict[Tuple[str, str], _Window]" = OrderedDict()
+        self.lines_in = 0
+        self.alerts_out = 0
+        self.evicted = 0
+
+    def add(self, line: str, keyword: str, log_file: str = "", now: Optional[float] = None) -> None:
+        mono = time.monotonic() if now is None else now
+        self.tick(mono)
+        self.lines_in += 1
+        pattern = fingerprint(line)
+        key = (log_file, pattern)
+        window = self._windows.get(key)
+        if window is None:
+            first = _Window(pattern, log_file, keyword, line.strip(), time.time(), mono)
+            self._send(key, first, "first", 1)
+            self._windows[key] = first
+            if len(self._windows) > self.max_fingerprints:
+                self.evicted += 1
+                self._close(*self._windows.popitem(last=False), evicted=True)
+            return
+        if window.count == 0:
+            window.sample = line.strip()
+            window.first_seen = time.time()
+        window.count += 1
+        window.last_seen = time.time()
+
+    def tick(self, now: Optional[float] = None) -> int:
+        """창이 끝난 패턴들을 닫고 반복 요약을 보냄. 보낸 개수"""
+        mono = time.monotonic() if now is None else now
+        sent = 0
+        while self._windows:
+            key, window = next(iter(self._windows.items()))
+            if mono - window.opened < self.window_s:
+                break  # 뒤쪽은 더 늦게 열린 창
+            del self._windows[key]
+            sent += self._close(key, window)
+        return sent
+
+    def flush(self) -> int:
+        """남은 창을 전부 닫고 반복 요약을 보냄"""
+        sent = 0
+        while self._windows:
+            sent += self._close(*self._windows.popitem(last=False))
+        return sent
+
+    def _close(self, key: Tuple[str, str], window: _Window, evicted: bool = False) -> int:
+        """반복이 없었으면 보낼 것 없음 (첫 줄은 add 에서 이미 보냄)"""
+        if window.count == 0:
+            return 0
+        self._send(key, window, "repeat", window.count, evicted)
+        return 1
+
+    def _send(self, key: Tuple[str, str], window: _Window, kind: str, count: int, evicted: bool = False) -> None:
+        self.alerts_out += 1
+        self.emit({
+            "timestamp": datetime.now().isoformat(),
+            "log_file": window.log_file,
+            "error_line": window.sample,
+            "keyword": window.keyword,
+            "severity": self.severity,
+            "fingerprint": hashlib.sha1("\0".join(key).encode("utf-8")).hexdigest()[:12],
+            "pattern": window.pattern,
+            "alert": kind,
+            "count": count,
+            "first_seen": datetime.fromtimestamp(window.first_seen).isoformat(),
+            "last_seen": datetime.fromtimestamp(window.last_seen).isoformat(),
+            "window_s": self.window_s,
+            "evicted": evicted,
+        })
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "open_windows": len(self._windows),
+            "lines_in": self.lines_in,
+            "alerts_out": self.alerts_out,
+            "evicted": self.evicted,
+            "reduction": round(self.lines_in / self.alerts_out, 1) if self.alerts_out else None,
+        }
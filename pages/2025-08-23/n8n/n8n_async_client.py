@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+n8n 비동기 클라이언트 (asyncio + httpx)
+n8n_python_examples.py 의 N8nClient 와 같은 메서드를 async 로 제공
+
+- keep-alive 커넥션 풀 (최대 연결 수 제한) 을 클라이언트 하나가 계속 재사용
+- connect / read / write / pool 타임아웃을 명시 → n8n 하나가 멈춰도 호출하는 쪽이 같이 멈추지 않음
+- trigger_many: 수천 개의 웹훅 이벤트를 동시 실행 수 제한 안에서 보내고, 이벤트별 결과와 소요 시간을 돌려줌
+
+필요한 패키지:
+pip install httpx
+
+사용 예:
+    async with AsyncN8nClient("http://localhost:5678") as n8n:
+        await n8n.trigger_webhook("system-monitor", {"cpu": 12.5})
+        results = await n8n.trigger_many([("error-alert", {...}), ...], concurrency=50)
+        print(summarize(results))
+
+부하 확인:
+    python n8n_async_client.py --webhook test-webhook -n 2000 -c 100
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+
+@dataclass
+class WebhookResult:
+    """trigger_many 이벤트 하나의 결과"""
+    index: int                     # 입력 순서
+    webhook_id: str
+    ok: bool
+    status: Optional[int]          # HTTP 상태 코드 (연결 실패/타임아웃이면 None)
+    elapsed_s: float               # 전송 시작부터 응답 본문까지 (풀 대기 포함)
+    data: Any = None
+    error: Optional[str] = None
+
+
+class AsyncN8nClient:
+    """n8n API 비동기 클라이언트"""
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:5678",
+        api_key: str = None,
+        max_connections: int = 20,
+        max_keepalive: int = 10,
+        connect_timeout: float = 3.0,
+        read_timeout: float = 30.0,
+        write_timeout: float = 10.0,
+        pool_timeout: float = 10.0,
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        headers = {'X-N8N-API-KEY': api_key} if api_key else {}
+
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=headers,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=30.0,
+            ),
+            timeout=httpx.Timeout(
+                connect=connect_timeout,
+                read=read_timeout,
+                write=write_timeout,
+                pool=pool_timeout,  # 풀이 꽉 차서 연결을 기다리는 시간
+            ),
+        )
+
+    async def __aenter__(self) -> "AsyncN8nClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def _post_webhook(self, webhook_id: str, data: Dict) -> Tuple[int, Any]:
+        """웹훅 POST. (상태 코드, 응답 JSON — JSON 이 아니면 텍스트). 실패는 예외로"""
+        response = await self.client.post(f"/webhook/{webhook_id}", json=data)
+        response.raise_for_status()
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, response.text
+
+    async def trigger_webhook(self, webhook_id: str, data: Dict) -> Dict:
+        """웹훅 트리거"""
+        try:
+            _, body = await self._post_webhook(webhook_id, data)
+            return body if isinstance(body, dict) else {"response": body}
+        except httpx.HTTPError as e:
+            print(f"웹훅 트리거 실패: {_describe_error(e)}")
+            return {}
+
+    async def get_workflows(self) -> List[Dict]:
+        """워크플로우 목록 조회"""
+        try:
+            response = await self.client.get("/api/v1/workflows")
+            response.raise_for_status()
+            return response.json().get('data', [])
+        except httpx.HTTPError as e:
+            print(f"워크플로우 조회 실패: {_describe_error(e)}")
+            return []
+
+    async def execute_workflow(self, workflow_id: str, data: Dict = None) -> Dict:
+        """워크플로우 수동 실행"""
+        payload = {"data": data or {}}
+        try:
+            response = await self.client.post(f"/api/v1/workflows/{workflow_id}/execute", json=payload)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            print(f"워크플로우 실행 실패: {_describe_error(e)}")
+            return {}
+
+    async def trigger_many(
+        self,
+        events: Sequence[Tuple[str, Dict]],
+        concurrency: int = 50,
+    ) -> List[WebhookResult]:
+        """
+        (webhook_id, data) 목록을 동시에 최대 concurrency 개씩 전송.
+        작업자 concurrency 개가 입력을 차례로 가져가므로 이벤트 수와 상관없이 태스크 수가 고정.
+        실패해도 예외를 올리지 않고 결과에 error 로 남김 (입력 순서대로 반환)
+        """
+        results: List[Optional[WebhookResult]] = [None] * len(events)
+        pending = iter(enumerate(events))
+
+        async def worker() -> None:
+            for index, (webhook_id, data) in pending:
+                t0 = time.perf_counter()
+                try:
+                    status, body = await self._post_webhook(webhook_id, data)
+                    results[index] = WebhookResult(
+                        index, webhook_id, True, status, time.perf_counter() - t0, body
+                    )
+                except httpx.HTTPError as e:
+                    status = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
+                    results[index] = WebhookResult(
+                        index, webhook_id, False, status, time.perf_counter() - t0, error=_describe_error(e)
+                    )
+
+        await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, len(events))))))
+        return results
+
+
+def _describe_error(e: httpx.HTTPError) -> str:
+    if isinstance(e, httpx.HTTPStatusError):
+        return f"HTTP {e.response.status_code}"
+    return f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+
+
+def summarize(results: Sequence[WebhookResult]) -> Dict[str, Any]:
+    """trigger_many 결과 요약: 성공/실패 수, 오류 종류별 수, 소요 시간 백분위"""
+    times = sorted(r.elapsed_s for r in results)
+
+    def pct(p: float) -> Optional[float]:
+        if not times:
+            return None
+        return round(times[min(len(times) - 1, int(len(times) * p / 100))] * 1000, 1)
+
+    errors: Dict[str, int] = {}
+    for r in results:
+        if r.error:
+            errors[r.error] = errors.get(r.error, 0) + 1
+    return {
+        "total": len(results),
+        "ok": sum(1 for r in results if r.ok),
+        "failed": sum(1 for r in results if not r.ok),
+        "errors": errors,
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+        "max_ms": round(times[-1] * 1000, 1) if times else None,
+    }
+
+
+# ============================================================================
+# 메인 실행부: 같은 웹훅으로 이벤트 n 개를 동시에 보내 보기
+# ============================================================================
+
+async def _main(args: argparse.Namespace) -> None:
+    events = [
+        (args.webhook, {"seq": i, "timestamp": datetime.now().isoformat(), "source": "n8n_async_client"})
+        for i in range(args.n)
+    ]
+    async with AsyncN8nClient(
+        args.url,
+        api_key=os.getenv('N8N_API_KEY'),
+        max_connections=args.c,
+        max_keepalive=args.c,
+        connect_timeout=args.connect_timeout,
+        read_timeout=args.read_timeout,
+    ) as n8n:
+        t0 = time.perf_counter()
+        results = await n8n.trigger_many(events, concurrency=args.c)
+        wall = time.perf_counter() - t0
+
+    summary = summarize(results)
+    mark = "✅" if not summary["failed"] else "⚠️"
+    print(f"{mark} {summary['ok']}/{summary['total']} 성공, {wall:.2f}초 ({summary['total'] / wall:.0f} events/s)")
+    print(f"   p50 {summary['p50_ms']}ms / p95 {summary['p95_ms']}ms / p99 {summary['p99_ms']}ms / max {summary['max_ms']}ms")
+    for error, count in summary["errors"].items():
+        print(f"   ❌ {error}: {count}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="n8n 웹훅 동시 전송")
+    parser.add_argument("--url", default=os.getenv('N8N_BASE_URL', "http://localhost:5678"))
+    parser.add_argument("--webhook", default="test-webhook")
+    parser.add_argument("-n", type=int, default=1000, help="보낼 이벤트 수")
+    parser.add_argument("-c", type=int, default=50, help="동시 실행 수 (= 최대 연결 수)")
+    parser.add_argument("--connect-timeout", type=float, default=3.0)
+    parser.add_argument("--read-timeout", type=float, default=30.0)
+    asyncio.run(_main(parser.parse_args()))
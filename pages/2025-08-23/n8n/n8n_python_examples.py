@@ -70,29 +70,63 @@ class N8nClient:
 # 예제 1: 시스템 모니터링 자동화
 # ============================================================================
 
-def system_health_check():
-    """시스템 상태 체크 후 n8n으로 데이터 전송"""
+_SAMPLER = None
+
+def get_sampler(interval_s: float = 5.0):
+    """백그라운드 시스템 샘플러 (처음 부를 때 시작, system_sampler.py 참고)"""
+    global _SAMPLER
+    if _SAMPLER is None:
+        from system_sampler import SystemSampler
+        _SAMPLER = SystemSampler(interval_s).start()
+    return _SAMPLER
+
+_SPOOL = None
+
+def get_spool():
+    """웹훅 이벤트 배치 스풀 (처음 부를 때 시작, 프로세스가 끝날 때 남은 것을 보내고 닫음, n8n_spool.py 참고)"""
+    global _SPOOL
+    if _SPOOL is None:
+        import atexit
+        from n8n_spool import EventSpool
+        _SPOOL = EventSpool(N8nClient())
+        atexit.register(_SPOOL.close)
+    return _SPOOL
+
+def _webhook_sender(spool):
+    """spool 인자 → send(webhook_id, data) 함수. None 이면 공유 스풀, False 면 이벤트마다 바로 POST"""
+    if spool is False:
+        return N8nClient().trigger_webhook
+    return (spool or get_spool()).submit
+
+def system_health_check(spool=None):
+    """시스템 상태 체크 후 n8n으로 데이터 전송
     
-    import psutil
+    지난 호출 이후 백그라운드 샘플러가 모은 값의 요약 (min/max/mean/p95, 네트워크는 초당 바이트)을 보냄.
+    샘플이 쌓여 있으면 기다리지 않음. 아직 없으면 (메뉴에서 한 번 실행 등) 예전처럼 1초 구간을 재서 보냄
+    기본은 공유 스풀(get_spool)에 넣어 배치로 전송. spool=False 면 바로 POST
+    """
     
-    # 시스템 정보 수집
+    sampler = get_sampler()
+    if not sampler.pending:
+        sampler.sample(min_elapsed_s=1.0)
+    
+    # 시스템 정보 수집 (지난 전송 이후 구간 요약)
+    summary = sampler.drain_aggregate()
     system_info = {
         "timestamp": datetime.now().isoformat(),
-        "cpu_percent": psutil.cpu_percent(interval=1),
-        "memory_percent": psutil.virtual_memory().percent,
-        "disk_percent": psutil.disk_usage('/').percent,
-        "network_sent": psutil.net_io_counters().bytes_sent,
-        "network_recv": psutil.net_io_counters().bytes_recv,
+        **summary,
     }
     
     # n8n 웹훅으로 데이터 전송
-    n8n = N8nClient()
+    send = _webhook_sender(spool)
     webhook_id = "system-monitor"  # n8n에서 설정한 웹훅 ID
     
-    result = n8n.trigger_webhook(webhook_id, system_info)
+    result = send(webhook_id, system_info)
     
+    cpu = summary["cpu_percent"]
     if result:
-        print(f"✅ 시스템 정보 전송 완료: CPU {system_info['cpu_percent']}%")
+        done = "전송 완료" if spool is False else "전송 대기열에 넣음"
+        print(f"✅ 시스템 정보 {done}: CPU 평균 {cpu['mean']}% / 최대 {cpu['max']}% ({summary['samples']}개 샘플)")
     else:
         print("❌ 시스템 정보 전송 실패")
     
@@ -102,41 +136,73 @@ def system_health_check():
 # 예제 2: 로그 파일 모니터링
 # ============================================================================
 
-def monitor_log_file(log_path: str, error_keywords: List[str]):
-    """로그 파일에서 에러 패턴 감지 및 알림"""
+def monitor_log_file(
+    log_path,
+    error_keywords: List[str],
+    spool=None,
+    checkpoint_path: str = None,
+    window_s: float = 60.0,
+):
+    """로그 파일에서 에러 패턴 감지 및 알림
+    
+    log_path 는 경로 하나 또는 경로 목록. log_tailer.LogTailer 로 블록 단위로 읽고
+    (inotify 로 깨어남, 로테이트/잘림 추적), checkpoint_path 를 주면 재시작 시 이어서 읽음.
+    한 줄에 키워드가 여러 개 있어도 알림은 한 번 (가장 앞의 키워드)
+    알림은 기본으로 공유 스풀(get_spool, n8n_spool.EventSpool)에 모아서 배치로 전송.
+    다른 스풀을 넘길 수도 있고, spool=False 면 알림마다 바로 POST
+    window_s > 0 이면 alert_aggregator.AlertAggregator 로 같은 패턴(숫자/시각/id 제거)의 에러는
+    처음 한 줄만 바로 알리고, 이후 window_s 동안의 반복은 요약 알림 하나로 묶음
+    (alert="repeat", count, first_seen, last_seen, 예시 줄). 0 이면 줄마다 알림
+    """
+    
+    from alert_aggregator import AlertAggregator
+    from log_tailer import LogTailer
     
-    n8n = N8nClient()
     webhook_id = "error-alert"
+    send = _webhook_sender(spool)
+    paths = [log_path] if isinstance(log_path, str) else list(log_path)
+    
+    missing = [p for p in paths if not os.path.exists(p)]
+    if missing:
+        print(f"❌ 로그 파일을 찾을 수 없음: {', '.join(missing)}")
+        return
+    
+    def send_summary(alert_data: Dict):
+        send(webhook_id, alert_data)
+        if alert_data["alert"] == "first":
+            print(f"🚨 에러 감지: {alert_data['keyword']} - {alert_data['error_line'][:100]}")
+        else:
+            print(f"🚨 에러 반복: {alert_data['keyword']} x{alert_data['count']} - {alert_data['pattern'][:100]}")
+    
+    aggregator = AlertAggregator(send_summary, window_s=window_s) if window_s > 0 else None
+    
+    def on_match(path: str, line: str, keyword: str):
+        if aggregator is not None:
+            aggregator.add(line, keyword, path)
+            return
+        
+        alert_data = {
+            "timestamp": datetime.now().isoformat(),
+            "log_file": path,
+            "error_line": line.strip(),
+            "keyword": keyword,
+            "severity": "ERROR"
+        }
+        
+        # n8n으로 알림 전송
+        send(webhook_id, alert_data)
+        print(f"🚨 에러 감지: {keyword} - {line.strip()[:100]}")
     
     try:
-        with open(log_path, 'r', encoding='utf-8') as file:
-            file.seek(0, 2)  # 파일 끝으로 이동
-            
-            while True:
-                line = file.readline()
-                if not line:
-                    time.sleep(1)
-                    continue
-                
-                # 에러 키워드 검사
-                for keyword in error_keywords:
-                    if keyword.lower() in line.lower():
-                        alert_data = {
-                            "timestamp": datetime.now().isoformat(),
-                            "log_file": log_path,
-                            "error_line": line.strip(),
-                            "keyword": keyword,
-                            "severity": "ERROR"
-                        }
-                        
-                        # n8n으로 알림 전송
-                        n8n.trigger_webhook(webhook_id, alert_data)
-                        print(f"🚨 에러 감지: {keyword} - {line.strip()[:100]}")
-                        
-    except FileNotFoundError:
-        print(f"❌ 로그 파일을 찾을 수 없음: {log_path}")
+        tailer = LogTailer(paths, error_keywords, checkpoint_path=checkpoint_path)
+        tailer.run(on_match, on_tick=aggregator.tick if aggregator is not None else None)
     except Exception as e:
         print(f"❌ 로그 모니터링 오류: {e}")
+    finally:
+        if aggregator is not None:
+            aggregator.flush()  # 중단되어도 세던 것은 보냄
+        if spool is not False:
+            (spool or get_spool()).flush()  # 스풀에 쌓인 것도 바로 (종료 시 get_spool 의 atexit 가 close)
 
 # ============================================================================
 # 예제 3: 데이터베이스 백업 자동화
@@ -298,11 +364,19 @@ def process_files_in_directory(directory_path: str):
 # 예제 6: 스케줄링 및 자동화 실행
 # ============================================================================
 
-def setup_scheduled_tasks():
-    """정기적인 작업 스케줄링"""
+def setup_scheduled_tasks(health_check_every_min: int = None):
+    """정기적인 작업 스케줄링
     
-    # 매일 오전 9시에 시스템 체크
-    schedule.every().day.at("09:00").do(system_health_check)
+    health_check_every_min: 시스템 상태 요약을 몇 분마다 보낼지 (None 이면 매일 오전 9시 한 번)
+    """
+    
+    # 시스템 상태 요약 (샘플은 백그라운드에서 계속 수집)
+    if health_check_every_min is None:
+        get_sampler(interval_s=30.0)  # 링 3600칸 = 30시간 → 하루치가 다 들어감
+        schedule.every().day.at("09:00").do(system_health_check)
+    else:
+        get_sampler()
+        schedule.every(health_check_every_min).minutes.do(system_health_check)
     
     # 매 시간마다 날씨 데이터 수집
     schedule.every().hour.do(fetch_and_process_api_data)
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+n8n 웹훅 이벤트 스풀 (배치 전송 + 디스크 저널)
+
+에러 폭주 때 알림 한 줄마다 trigger_webhook POST 를 날리면 n8n 실행이 수천 개 생긴다.
+EventSpool 은 webhook_id 별로 이벤트를 모았다가 한 번의 POST 로 보낸다.
+
+- submit(webhook_id, data): 큐에 넣기만 하고 바로 반환 (네트워크 없음)
+- 백그라운드 스레드가 보냄:
+    * 한 webhook_id 에 max_batch 개가 쌓이면 바로 (여러 배치만큼 밀려 있으면 기다리지 않고 연달아)
+    * 가장 오래된 이벤트가 max_age_s 를 넘으면 (덜 찼어도)
+  본문: {"batch": true, "count": n, "events": [data, ...]}  → n8n 에서는 events 를 Item Lists 로 펼쳐서 처리
+- 전송 실패 (연결 실패, 타임아웃, 5xx, 429) 하면 배치를 저널 파일에 한 줄(JSON) 씩 덧붙인다.
+    * 저널은 덧붙이기만 함. 어디까지 다시 보냈는지는 <journal>.offset 에 바이트 위치로 기록
+    * replay_interval_s 마다 오프셋부터 다시 보내 보고, 다 보내면 저널/오프셋을 비움
+    * 저널에 밀린 게 있으면 새 배치도 저널 뒤에 붙임 → 보내는 순서 유지
+    * 프로세스가 재시작해도 저널이 남아 있으면 이어서 보냄
+- 다시 보내도 안 될 실패 (404 처럼 429 가 아닌 4xx — 등록 안 된 webhook_id 등) 는 저널에 넣지 않고
+  <journal>.dead 에 따로 남김 → 배치 하나 때문에 다른 웹훅까지 막히지 않음
+- stats(): 큐 깊이 (webhook_id 별), 저널에 밀린 배치 수, 버린(dead) 배치 수, 전송 지연 p50/p95/max 등
+
+필요한 패키지:
+pip install requests
+
+사용 예:
+    n8n = N8nClient()
+    with EventSpool(n8n, max_batch=200, max_age_s=2.0) as spool:
+        spool.submit("error-alert", {...})
+
+자체 점검 (네트워크 없이 가짜 세션으로, 밀린 큐가 max_age_s 를 기다리지 않고 다 빠지는지 / 4xx 가 막지 않는지):
+    python n8n_spool.py --selftest
+"""
+
+import json
+import os
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+LATENCY_RING = 1024  # 최근 전송 지연을 몇 개까지 기억할지
+
+
+def _retryable(e: requests.exceptions.RequestException) -> bool:
+    """나중에 다시 보내면 될 수도 있는 실패인지 (연결 실패 / 타임아웃 / 5xx / 429)"""
+    if isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    status = e.response.status_code if e.response is not None else None
+    return status is not None and (status >= 500 or status == 429)
+
+
+class EventSpool:
+    """webhook_id 별 배치 스풀 (N8nClient 의 session / base_url 을 그대로 씀)"""
+
+    def __init__(
+        self,
+        client,
+        max_batch: int = 100,
+        max_age_s: float = 2.0,
+        journal_path: str = "n8n_spool.journal",
+        replay_interval_s: float = 10.0,
+        timeout: Tuple[float, float] = (3.0, 10.0),
+        max_queue: int = 100000,
+    ):
+        self.client = client
+        self.max_batch = max_batch
+        self.max_age_s = max_age_s
+        self.journal_path = journal_path
+        self.offset_path = journal_path + ".offset"
+        self.dead_path = journal_path + ".dead"
+        self.replay_interval_s = replay_interval_s
+        self.timeout = timeout  # (connect, read)
+        self.max_queue = max_queue
+
+        self._queues: Dict[str, List[Tuple[float, Dict]]] = {}  # webhook_id → [(넣은 시각, data), ...]
+        self._queued = 0
+        self._cond = threading.Condition()
+        self._closing = False
+        self._flush_all = False
+        self._next_replay = 0.0
+
+        self._latencies = array("d", bytes(8 * LATENCY_RING))
+        self.flushes = 0
+        self.events_sent = 0
+        self.events_dropped = 0
+        self.send_failures = 0
+        self.journaled_batches = 0
+        self.replayed_batches = 0
+        self.dead_batches = 0
+        self.last_error: Optional[str] = None
+
+        self._thread = threading.Thread(target=self._run, name="n8n-spool", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "EventSpool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---------------------------
+    # 넣기
+    # ---------------------------
+    def submit(self, webhook_id: str, data: Dict) -> bool:
+        """큐에 넣음. 큐가 max_queue 로 꽉 차 있으면 버리고 False"""
+        with self._cond:
+            if self._queued >= self.max_queue:
+                self.events_dropped += 1
+                return False
+            queue = self._queues.get(webhook_id)
+            if queue is None:
+                queue = self._queues[webhook_id] = []
+            queue.append((time.monotonic(), data))
+            self._queued += 1
+            if len(queue) >= self.max_batch:
+                self._cond.notify()
+        return True
+
+    # ---------------------------
+    # 백그라운드 전송
+    # ---------------------------
+    def _take_due(self, now: float, force: bool) -> List[Tuple[str, List[Dict]]]:
+        """보낼 때가 된 배치들을 큐에서 떼어냄 (락 안에서 호출)
+        꽉 찬 배치는 남김없이, 나머지는 가장 오래된 이벤트가 max_age_s 를 넘었을 때만
+        """
+        due = []
+        for webhook_id, queue in self._queues.items():
+            while queue and (force or len(queue) >= self.max_batch or now - queue[0][0] >= self.max_age_s):
+                batch = [data for _, data in queue[: self.max_batch]]
+                del queue[: self.max_batch]
+                self._queued -= len(batch)
+                due.append((webhook_id, batch))
+        return due
+
+    def _wait_s(self, now: float) -> float:
+        """다음 배치가 만료될 때까지 (꽉 찬 큐가 있으면 0, 아무것도 없으면 재전송 주기까지)"""
+        if self._flush_all:
+            return 0.0
+        wait = self.replay_interval_s
+        for queue in self._queues.values():
+            if len(queue) >= self.max_batch:
+                return 0.0
+            if queue:
+                wait = min(wait, queue[0][0] + self.max_age_s - now)
+        return max(0.0, wait)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closing:
+                    self._cond.wait(self._wait_s(time.monotonic()))
+                closing = self._closing
+                due = self._take_due(time.monotonic(), force=closing or self._flush_all)
+                self._flush_all = False
+            for webhook_id, batch in due:
+                self._flush(webhook_id, batch)
+            if time.monotonic() >= self._next_replay:
+                self._replay()
+            if closing:
+                with self._cond:
+                    if not self._queued:
+                        return
+
+    def _post(self, webhook_id: str, events: List[Dict]) -> None:
+        url = f"{self.client.base_url}/webhook/{webhook_id}"
+        body = {"batch": True, "count": len(events), "events": events}
+        t0 = time.perf_counter()
+        response = self.client.session.post(url, json=body, timeout=self.timeout)
+        response.raise_for_status()
+        self._latencies[self.flushes % LATENCY_RING] = time.perf_counter() - t0
+        self.flushes += 1
+        self.events_sent += len(events)
+
+    def _flush(self, webhook_id: str, events: List[Dict]) -> None:
+        if self._journal_pending():
+            self._append_journal(webhook_id, events)  # 밀린 것부터 보내야 순서가 맞음
+            return
+        try:
+            self._post(webhook_id, events)
+        except requests.exceptions.RequestException as e:
+            self.send_failures += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            if not _retryable(e):
+                self._append_dead(webhook_id, events, self.last_error)
+                return
+            self._next_replay = time.monotonic() + self.replay_interval_s
+            self._append_journal(webhook_id, events)
+
+    # ---------------------------
+    # 저널
+    # ---------------------------
+    def _read_offset(self) -> int:
+        try:
+            with open(self.offset_path, encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _write_offset(self, offset: int) -> None:
+        tmp = self.offset_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(str(offset))
+        os.replace(tmp, self.offset_path)
+
+    def _journal_pending(self) -> bool:
+        try:
+            return os.path.getsize(self.journal_path) > self._read_offset()
+        except FileNotFoundError:
+            return False
+
+    def _append_line(self, path: str, entry: Dict) -> None:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _append_journal(self, webhook_id: str, events: List[Dict]) -> None:
+        self._append_line(self.journal_path, {"webhook_id": webhook_id, "events": events, "ts": time.time()})
+        self.journaled_batches += 1
+
+    def _append_dead(self, webhook_id: str, events: List[Dict], error: str) -> None:
+        """다시 보내도 안 될 배치 → dead 파일 (저널 순서를 막지 않게)"""
+        entry = {"webhook_id": webhook_id, "events": events, "ts": time.time(), "error": error}
+        self._append_line(self.dead_path, entry)
+        self.dead_batches += 1
+
+    def _replay(self) -> None:
+        """저널에서 아직 안 보낸 배치를 순서대로 전송. 다시 해 볼 만한 실패면 그 자리에서 멈추고 다음 주기에"""
+        self._next_replay = time.monotonic() + self.replay_interval_s
+        if not self._journal_pending():
+            return
+        offset = self._read_offset()
+        with open(self.journal_path, "rb") as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # 쓰다 만 줄 (비정상 종료)
+                try:
+                    entry = json.loads(raw)
+                except ValueError:
+                    offset += len(raw)  # 깨진 줄은 건너뜀
+                    continue
+                try:
+                    self._post(entry["webhook_id"], entry["events"])
+                except requests.exceptions.RequestException as e:
+                    self.send_failures += 1
+                    self.last_error = f"{type(e).__name__}: {e}"
+                    if _retryable(e):
+                        break
+                    self._append_dead(entry["webhook_id"], entry["events"], self.last_error)
+                else:
+                    self.replayed_batches += 1
+                offset += len(raw)
+                self._write_offset(offset)
+
+        if offset >= os.path.getsize(self.journal_path):
+            # 다 보냈으면 비움 (오프셋 파일을 먼저 지우면 재시작 때 중복 전송될 수 있으니 저널부터)
+            open(self.journal_path, "w").close()
+            os.remove(self.offset_path)
+
+    # ---------------------------
+    # 종료 / 통계
+    # ---------------------------
+    def flush(self) -> None:
+        """지금 쌓인 것을 전부 보내도록 깨움 (보낼 때까지 기다리지는 않음)"""
+        with self._cond:
+            self._flush_all = True
+            self._cond.notify()
+
+    def close(self, timeout: float = 30.0) -> None:
+        """남은 이벤트를 보내고 (실패분은 저널로) 스레드 종료"""
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        n = min(self.flushes, LATENCY_RING)
+        lat = sorted(self._latencies[:n])
+
+        def pct(p: float) -> Optional[float]:
+            return round(lat[min(n - 1, int(n * p / 100))] * 1000, 1) if n else None
+
+        with self._cond:
+            depth = {k: len(q) for k, q in self._queues.items() if q}
+        try:
+            journal_bytes = os.path.getsize(self.journal_path) - self._read_offset()
+        except FileNotFoundError:
+            journal_bytes = 0
+        return {
+            "queue_depth": sum(depth.values()),
+            "queue_by_webhook": depth,
+            "flushes": self.flushes,
+            "events_sent": self.events_sent,
+            "events_dropped": self.events_dropped,
+            "send_failures": self.send_failures,
+            "journaled_batches": self.journaled_batches,
+            "replayed_batches": self.replayed_batches,
+            "dead_batches": self.dead_batches,
+            "journal_pending_bytes": journal_bytes,
+            "flush_p50_ms": pct(50),
+            "flush_p95_ms": pct(95),
+            "flush_max_ms": round(lat[-1] * 1000, 1) if n else None,
+            "last_error": self.last_error,
+        }
+
+
+# ============================================================================
+# 자체 점검
+# ============================================================================
+
+class _StubResponse:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"HTTP {self.status_code}", response=self)
+
+
+class _StubSession:
+    """POST 를 기록만 하는 가짜 세션. missing 웹훅은 404"""
+
+    def __init__(self):
+        self.posts: List[Tuple[float, str, int]] = []  # (시각, webhook_id, 이벤트 수)
+
+    def post(self, url: str, json: Dict, timeout=None) -> _StubResponse:
+        webhook_id = url.rsplit("/", 1)[1]
+        if webhook_id == "missing":
+            return _StubResponse(404)
+        self.posts.append((time.monotonic(), webhook_id, json["count"]))
+        return _StubResponse(200)
+
+
+def _selftest(workdir: str) -> None:
+    class Client:
+        base_url = "http://stub"
+        session = _StubSession()
+
+    client = Client()
+    spool = EventSpool(client, max_batch=100, max_age_s=2.0, journal_path=os.path.join(workdir, "spool.journal"))
+
+    # 1) 1000 개가 한꺼번에 밀려도 max_age_s(2초) 를 기다리지 않고 바로 다 빠져야 함
+    t0 = time.monotonic()
+    spool.submit("missing", {"seq": -1})  # 404 → dead, 뒤를 막으면 안 됨 (덜 찬 배치라 2초 뒤에 나감)
+    for i in range(1000):
+        spool.submit("error-alert", {"seq": i})
+    deadline = t0 + 1.0
+    while spool.stats()["queue_by_webhook"].get("error-alert") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stats = spool.stats()
+    sent = [n for _, w, n in client.session.posts if w == "error-alert"]
+    assert sum(sent) == 1000 and max(sent) <= 100, (sent, stats)
+    assert client.session.posts[-1][0] - t0 < 1.0, "backlog waited for max_age_s"
+
+    # 2) 덜 찬 배치는 가장 오래된 이벤트 기준 max_age_s 후에
+    t1 = time.monotonic()
+    for i in range(5):
+        spool.submit("system-monitor", {"seq": i})
+    while not any(w == "system-monitor" for _, w, _ in client.session.posts) and time.monotonic() < t1 + 5:
+        time.sleep(0.05)
+    waited = next(t for t, w, _ in client.session.posts if w == "system-monitor") - t1
+    assert 1.8 <= waited < 3.0, waited
+    stats = spool.stats()  # 덜 찬 missing 배치도 이때 나감 → 404 는 저널이 아니라 dead 로
+    assert stats["dead_batches"] == 1 and stats["journaled_batches"] == 0, stats
+
+    spool.close()
+    print(f"✅ backlog 1000 → {len(sent)} POST, {client.session.posts[len(sent) - 1][0] - t0:.3f}s; partial batch after {waited:.2f}s")
+    print(json.dumps(spool.stats(), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="n8n 웹훅 이벤트 스풀")
+    parser.add_argument("--selftest", action="store_true", help="가짜 세션으로 배치/저널 동작 점검")
+    args = parser.parse_args()
+    if args.selftest:
+        with tempfile.TemporaryDirectory() as workdir:
+            _selftest(workdir)
+    else:
+        parser.print_help()
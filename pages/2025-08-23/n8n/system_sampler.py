@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+시스템 지표 백그라운드 샘플러 (system_health_check 용)
+
+예전 system_health_check 는 psutil.cpu_percent(interval=1) 로 호출한 쪽을 1초 동안 막고,
+net_io_counters() 를 두 번 부르고, 그 순간의 값 하나만 보냈다 → 스케줄 사이의 짧은 스파이크는 안 보임.
+
+- 데몬 스레드가 interval_s 마다 CPU / 메모리 / 디스크 / 네트워크를 잰다
+    * cpu_percent(interval=None): 직전 호출 이후 평균이라 기다리지 않음 (시작할 때 한 번 기준점)
+    * net_io_counters() 는 샘플당 한 번, 직전 값과의 차이(바이트)만 저장
+- 저장: 필드마다 array 하나인 고정 크기 링 버퍼 (capacity 개, 시작할 때 할당)
+- aggregate(): 구간 요약 — 필드별 min / max / mean / p95, 네트워크는 초당 바이트(rate) 기준 + 합계
+  drain_aggregate() 는 지난번 호출 이후의 샘플만 (n8n 으로 보낼 때)
+- 샘플러 자신이 쓴 CPU 시간 (time.thread_time) 을 같이 보고 → 비용이 보이게
+
+    python system_sampler.py --interval 0.5 --seconds 10
+"""
+
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional
+
+import psutil
+
+FIELDS = ("cpu_percent", "memory_percent", "disk_percent")
+
+
+class SystemSampler:
+    def __init__(self, interval_s: float = 1.0, capacity: int = 3600, disk_path: str = "/"):
+        self.interval_s = interval_s
+        self.capacity = capacity
+        self.disk_path = disk_path
+
+        self.ts = array("d", bytes(8 * capacity))
+        self.elapsed = array("d", bytes(8 * capacity))  # 직전 샘플과의 실제 간격
+        self.values = {name: array("f", bytes(4 * capacity)) for name in FIELDS}
+        self.net_sent = array("Q", bytes(8 * capacity))  # 간격 동안 보낸 바이트
+        self.net_recv = array("Q", bytes(8 * capacity))
+        self.written = 0
+
+        self.own_cpu_s = 0.0  # 샘플링에 쓴 CPU 시간 (스레드 기준)
+        self.started_at: Optional[float] = None
+        self._drained = 0
+        self._lock = threading.Lock()  # 링 버퍼 (쓰기 / 집계)
+        # 측정 한 번 전체 (_prev_* 와 psutil.cpu_percent 의 프로세스 전역 기준점). 데몬 스레드와
+        # system_health_check 처럼 직접 부르는 쪽이 동시에 재면 간격이 섞이거나 0 에 가까워지므로 한 번에 하나씩
+        self._sample_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._prev_net = None
+        self._prev_t = 0.0
+
+    # ---------------------------
+    # 샘플링
+    # ---------------------------
+    def _prime(self) -> None:
+        psutil.cpu_percent(interval=None)  # 기준점 (첫 값은 의미 없음)
+        self._prev_net = psutil.net_io_counters()
+        self._prev_t = time.monotonic()
+
+    def sample(self, min_elapsed_s: float = 0.0) -> None:
+        """지금 한 번 재서 링에 넣음.
+        min_elapsed_s: 직전 측정(기준점)에서 이만큼 안 지났으면 그때까지 기다렸다가 잼
+        (방금 기준점을 잡은 직후라면 CPU / 네트워크가 0 구간이 되므로)
+        기다리는 동안은 락을 놓음 → 그 사이 데몬 스레드가 재면 기준점이 바뀌므로 다시 계산
+        """
+        while True:
+            with self._sample_lock:
+                if self._prev_net is None:
+                    self._prime()
+                wait = self._prev_t + min_elapsed_s - time.monotonic()
+                if wait <= 0:
+                    self._sample_locked()
+                    return
+            time.sleep(wait)
+
+    def _sample_locked(self) -> None:
+        c0 = time.thread_time()
+        now = time.monotonic()
+        cpu = psutil.cpu_percent(interval=None)
+        memory = psutil.virtual_memory().percent
+        disk = psutil.disk_usage(self.disk_path).percent
+        net = psutil.net_io_counters()
+
+        with self._lock:
+            row = self.written % self.capacity
+            self.ts[row] = time.time()
+            self.elapsed[row] = now - self._prev_t
+            self.values["cpu_percent"][row] = cpu
+            self.values["memory_percent"][row] = memory
+            self.values["disk_percent"][row] = disk
+            # 카운터가 리셋(인터페이스 재시작 등)되면 음수 대신 0
+            self.net_sent[row] = max(0, net.bytes_sent - self._prev_net.bytes_sent)
+            self.net_recv[row] = max(0, net.bytes_recv - self._prev_net.bytes_recv)
+            self.written += 1
+        self._prev_net, self._prev_t = net, now
+        self.own_cpu_s += time.thread_time() - c0
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self.sample()
+
+    def start(self) -> "SystemSampler":
+        if self._thread is None:
+            with self._sample_lock:
+                self._prime()
+            self.started_at = time.monotonic()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="system-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "SystemSampler":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # ---------------------------
+    # 집계
+    # ---------------------------
+    def _rows(self, since: int) -> List[int]:
+        """seq since 이후 (링에 남아 있는 것만) 의 행 번호, 오래된 순"""
+        start = max(since, self.written - self.capacity, 0)
+        return [seq % self.capacity for seq in range(start, self.written)]
+
+    def aggregate(self, last_n: Optional[int] = None, since: Optional[int] = None) -> Dict[str, Any]:
+        """최근 last_n 개 (또는 seq since 이후) 샘플 요약"""
+        with self._lock:
+            if since is None:
+                since = self.written - (last_n if last_n is not None else self.capacity)
+            out = self._aggregate_locked(since)
+        out["sampler"] = self.cost()
+        return out
+
+    def _aggregate_locked(self, since: int) -> Dict[str, Any]:
+        rows = self._rows(since)
+        out: Dict[str, Any] = {
+            "samples": len(rows),
+            "overwritten": max(0, self.written - self.capacity - max(since, 0)),  # 요약 전에 링에서 밀려난 샘플
+            "interval_s": self.interval_s,
+            "from": self.ts[rows[0]] if rows else None,
+            "to": self.ts[rows[-1]] if rows else None,
+        }
+        for name in FIELDS:
+            col = self.values[name]
+            out[name] = _summary([col[r] for r in rows])
+        for name, col in (("net_sent", self.net_sent), ("net_recv", self.net_recv)):
+            rates = [col[r] / self.elapsed[r] for r in rows if self.elapsed[r] > 0]
+            out[f"{name}_bps"] = _summary(rates)
+            out[f"{name}_bytes"] = sum(col[r] for r in rows)
+        return out
+
+    @property
+    def pending(self) -> int:
+        """지난번 drain 이후 쌓인 샘플 수"""
+        return self.written - self._drained
+
+    def drain_aggregate(self) -> Dict[str, Any]:
+        """지난번 drain 이후 샘플 요약 (n8n 으로 보낼 때)"""
+        with self._lock:  # 요약한 범위와 다음 drain 의 시작이 어긋나지 않게 한 번에
+            out = self._aggregate_locked(self._drained)
+            self._drained = self.written
+        out["sampler"] = self.cost()
+        return out
+
+    def cost(self) -> Dict[str, Any]:
+        wall = time.monotonic() - self.started_at if self.started_at else 0.0
+        return {
+            "samples_total": self.written,
+            "cpu_s": round(self.own_cpu_s, 4),
+            "cpu_percent": round(self.own_cpu_s / wall * 100, 4) if wall else None,
+            "cpu_ms_per_sample": round(self.own_cpu_s / self.written * 1000, 3) if self.written else None,
+        }
+
+
+def _summary(vals: List[float]) -> Optional[Dict[str, float]]:
+    if not vals:
+        return None
+    ordered = sorted(vals)
+    return {
+        "min": round(ordered[0], 2),
+        "max": round(ordered[-1], 2),
+        "mean": round(sum(ordered) / len(ordered), 2),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="시스템 지표 샘플러")
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    with SystemSampler(args.interval) as sampler:
+        print(f"📊 {args.seconds:.0f}초 동안 {args.interval}초 간격으로 샘플링...")
+        time.sleep(args.seconds)
+    print(json.dumps(sampler.aggregate(), indent=2, ensure_ascii=False))
@@ -0,0 +1,154 @@
+# admission.py
+"""
+입장 제어 / 과부하 차단 (포화된 Rasa 백엔드 흉내)
+
+- 동시 처리 상한 max_in_flight (0 이면 제한 없음)
+- 꽉 차면 최대 max_queue 개까지 FIFO 로 대기, queue_timeout_s 안에 자리가 안 나면 차단
+- 대기열까지 꽉 차면 바로 차단
+  → 503 + Retry-After
+- sender 별 토큰 버킷 (rate/s, burst) 을 넘으면 429 + Retry-After
+
+release() 는 대기 중인 요청에게 자리를 바로 넘겨준다 (in-flight 수는 그대로).
+"""
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, Optional
+
+
+class Shed(Exception):
+    """요청 차단. status 429(rate limit) / 503(overload)"""
+
+    def __init__(self, reason: str, status: int, retry_after_s: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.status = status
+        self.retry_after_s = retry_after_s
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after_s)))
+
+
+class TokenBuckets:
+    """sender 별 토큰 버킷. 오래 안 쓴 버킷은 LRU 로 max_senders 개까지만 유지."""
+
+    def __init__(self, rate: float, burst: float, max_senders: int = 100_000):
+        self.rate = rate
+        self.burst = burst
+        self.max_senders = max_senders
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    def take(self, sender: str) -> float:
+        """토큰 하나를 쓰고 0 을 돌려줌. 모자라면 다음 토큰까지 남은 초."""
+        now = time.monotonic()
+        bucket = self._buckets.get(sender)
+        if bucket is None:
+            bucket = [self.burst, now]
+            self._buckets[sender] = bucket
+            if len(self._buckets) > self.max_senders:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(sender)
+            tokens, last = bucket
+            bucket[0] = min(self.burst, tokens + (now - last) * self.rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1.0:
+            bucket[0] -= 1.0
+            return 0.0
+        return (1.0 - bucket[0]) / self.rate
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_in_flight: int = 0,
+        max_queue: int = 100,
+        queue_timeout_s: float = 1.0,
+        retry_after_s: float = 1.0,
+        sender_rate: float = 0.0,
+        sender_burst: float = 5.0,
+        on_shed: Optional[Callable[[str], None]] = None,
+        on_wait: Optional[Callable[[float], None]] = None,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout_s = queue_timeout_s
+        self.retry_after_s = retry_after_s
+        self.buckets = TokenBuckets(sender_rate, sender_burst) if sender_rate > 0 else None
+        self.on_shed = on_shed
+        self.on_wait = on_wait
+
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.shed: Dict[str, int] = {"rate_limited": 0, "queue_full": 0, "queue_timeout": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_in_flight > 0 or self.buckets is not None
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _shed(self, reason: str, status: int, retry_after_s: float) -> Shed:
+        self.shed[reason] += 1
+        if self.on_shed:
+            self.on_shed(reason)
+        return Shed(reason, status, retry_after_s)
+
+    async def acquire(self, sender: Optional[str] = None) -> None:
+        if self.buckets is not None and sender is not None:
+            wait = self.buckets.take(sender)
+            if wait > 0:
+                raise self._shed("rate_limited", 429, wait)
+
+        if self.max_in_flight <= 0 or self.in_flight < self.max_in_flight:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            raise self._shed("queue_full", 503, self.retry_after_s)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        t0 = time.perf_counter()
+        try:
+            await asyncio.wait_for(fut, self.queue_timeout_s)
+        except asyncio.TimeoutError:
+            raise self._shed("queue_timeout", 503, self.retry_after_s) from None
+        finally:
+            if not fut.done() or fut.cancelled():
+                try:
+                    self._waiters.remove(fut)
+                except ValueError:
+                    pass
+        # release() 가 자리를 넘겨준 상태 (in_flight 는 이미 계산돼 있음)
+        self.admitted += 1
+        if self.on_wait:
+            self.on_wait(time.perf_counter() - t0)
+
+    def release(self) -> None:
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)  # 자리 인계
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "enabled": self.enabled,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "queue_timeout_s": self.queue_timeout_s,
+            "sender_rate": self.buckets.rate if self.buckets else None,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+        }
@@ -0,0 +1,170 @@
+# fastjson.py
+"""
+웹훅 요청/응답 JSON 빠른 경로 (MOCK_FAST_JSON=1 일 때만)
+
+- 요청: msgspec 의 스키마 고정 디코더 (bytes → Payload, 검증까지 한 번에)
+- 응답: orjson.dumps (bytes 로 바로)
+둘 다 없으면 표준 json 으로 같은 일을 한다 (느리지만 동작은 같음).
+    pip install msgspec orjson   # 선택
+
+응답 바이트는 FastAPI JSONResponse 와 같다:
+    json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+(문자열/정수/리스트/dict, round() 된 float 만 담는 응답 기준. 벤치마크에서 매번 비교한다)
+
+벤치마크:
+    python fastjson.py [--iterations 20000] [--answer-chars 500]
+"""
+import json
+from typing import Any, Dict, List, Optional
+
+try:
+    import msgspec  # type: ignore
+except ImportError:  # 선택 의존성
+    msgspec = None
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # 선택 의존성
+    orjson = None
+
+
+class DecodeError(ValueError):
+    """본문이 JSON 이 아니거나 스키마에 안 맞음 (→ 422)"""
+
+
+if msgspec is not None:
+    class Payload(msgspec.Struct):
+        sender: str
+        message: str
+        metadata: Optional[Dict[str, Any]] = None
+
+    _decode_one = msgspec.json.Decoder(Payload).decode
+    _decode_many = msgspec.json.Decoder(List[Payload]).decode
+    _DECODE_ERRORS = (msgspec.DecodeError, msgspec.ValidationError)
+else:
+    class Payload:
+        __slots__ = ("sender", "message", "metadata")
+
+        def __init__(self, sender: str, message: str, metadata: Optional[Dict[str, Any]] = None):
+            self.sender = sender
+            self.message = message
+            self.metadata = metadata
+
+    def _from_obj(obj: Any) -> "Payload":
+        if not isinstance(obj, dict):
+            raise DecodeError("Expected `object`")
+        sender, message, metadata = obj.get("sender"), obj.get("message"), obj.get("metadata")
+        if not isinstance(sender, str) or not isinstance(message, str):
+            raise DecodeError("`sender` and `message` must be strings")
+        if metadata is not None and not isinstance(metadata, dict):
+            raise DecodeError("`metadata` must be an object or null")
+        return Payload(sender, message, metadata)
+
+    def _decode_one(body: bytes) -> "Payload":
+        return _from_obj(json.loads(body))
+
+    def _decode_many(body: bytes) -> List["Payload"]:
+        items = json.loads(body)
+        if not isinstance(items, list):
+            raise DecodeError("Expected `array`")
+        return [_from_obj(o) for o in items]
+
+    _DECODE_ERRORS = (ValueError,)
+
+
+def decode_payload(body: bytes) -> Payload:
+    try:
+        return _decode_one(body)
+    except _DECODE_ERRORS as e:
+        raise DecodeError(str(e)) from None
+
+
+def decode_payloads(body: bytes) -> List[Payload]:
+    try:
+        return _decode_many(body)
+    except _DECODE_ERRORS as e:
+        raise DecodeError(str(e)) from None
+
+
+if orjson is not None:
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+else:
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def backend() -> Dict[str, str]:
+    return {
+        "decode": f"msgspec {msgspec.__version__}" if msgspec is not None else "json",
+        "encode": f"orjson {orjson.__version__}" if orjson is not None else "json",
+    }
+
+
+# ---------------------------
+# 벤치마크: pydantic + JSONResponse vs 빠른 경로
+# ---------------------------
+def _bench() -> None:
+    import argparse
+    import random
+    import string
+    import time
+
+    from fastapi.responses import JSONResponse
+
+    from mock_server import WebhookPayload
+
+    parser = argparse.ArgumentParser(description="webhook JSON codec: default vs fast path")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--answer-chars", type=int, default=500,
+                        help="08-23 목 서버처럼 응답에 넣을 랜덤 answer 길이 (0이면 없음)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    body = json.dumps(
+        {"sender": "user_1234", "message": "안녕하세요 주문한 상품 배송 언제 오나요?", "metadata": {"slots": {"city": "서울"}}},
+        ensure_ascii=False,
+    ).encode("utf-8")
+    resp: Dict[str, Any] = {
+        "messages": [{"recipient_id": "user_1234", "text": t} for t in (
+            "안녕하세요! 무엇을 도와드릴까요?", "잠시만 기다려 주세요, 확인 중입니다.", "좋은 하루 되세요!")],
+        "flows": [{"set_slot": "current_flow=order_tracking"}, {"set_slot": "turn_count=3"},
+                  {"set_slot": "debug_delay=0.42s"}],
+        "echo": {"sender": "user_1234", "message": "안녕하세요 주문한 상품 배송 언제 오나요?",
+                 "received_at": "2025-08-24T10:00:00.123456+00:00", "client_host": "127.0.0.1",
+                 "matched_intents": ["order_tracking"]},
+        "server_metrics": {"delay_s": 0.421, "elapsed_s": 0.423},
+    }
+    if args.answer_chars:
+        resp["answer"] = "".join(rng.choices(string.ascii_letters + string.digits, k=args.answer_chars))
+
+    # 바이트 단위로 같은지 먼저 확인 (api.js 파서가 보는 건 이 바이트)
+    assert JSONResponse(resp).body == dumps(resp), "fast encoder output differs from JSONResponse"
+    fast = decode_payload(body)
+    slow = WebhookPayload.model_validate_json(body)
+    assert (fast.sender, fast.message, fast.metadata) == (slow.sender, slow.message, slow.metadata)
+
+    def timeit(fn) -> float:
+        t0 = time.perf_counter()
+        for _ in range(args.iterations):
+            fn()
+        return (time.perf_counter() - t0) / args.iterations * 1e6
+
+    rows = [
+        ("decode  pydantic", timeit(lambda: WebhookPayload.model_validate_json(body))),
+        ("decode  fast", timeit(lambda: decode_payload(body))),
+        ("encode  JSONResponse", timeit(lambda: JSONResponse(resp).body)),
+        ("encode  fast", timeit(lambda: dumps(resp))),
+    ]
+    print(f"backend: {backend()}  body {len(body)} B, response {len(dumps(resp))} B, "
+          f"{args.iterations} iterations")
+    for name, us in rows:
+        print(f"{name:<22} {us:8.2f} us/req")
+    before = rows[0][1] + rows[2][1]
+    after = rows[1][1] + rows[3][1]
+    print(f"{'decode+encode':<22} {before:8.2f} -> {after:.2f} us/req  (x{before / after:.1f})")
+
+
+if __name__ == "__main__":
+    _bench()
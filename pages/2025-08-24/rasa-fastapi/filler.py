@@ -0,0 +1,192 @@
+# filler.py
+"""
+응답 크기 모델 + 채움(filler) 버퍼 + 선택적 압축
+
+08-23 목 서버는 요청마다 random.choices 로 500자 문자열을 새로 만들었다.
+여기서는 시작 시 랜덤 영숫자 버퍼를 한 번만 만들고, 요청마다 임의 위치에서 필요한 길이만 잘라 쓴다.
+
+크기 모델은 지연 모델과 같은 스펙 문법 (latency.py, 단위만 바이트):
+    MOCK_RESPONSE_SIZE="fixed:500"                          # 08-23 과 같은 크기
+    MOCK_RESPONSE_SIZE="lognormal:4096,1.0,4000000"         # 가끔 MB 단위
+    MOCK_RESPONSE_SIZE_INTENTS="product_master_data=uniform:100000,2000000;greeting=fixed:0"
+    MOCK_RESPONSE_SIZE_MAX=16777216                         # 버퍼 크기 = 상한
+비어 있으면 채움 없음 (기본).
+
+압축 (비스트리밍 응답만, 본문이 임계값 이상이고 클라이언트가 Accept-Encoding 으로 받을 때):
+    MOCK_COMPRESS=off|gzip|br|auto     # auto: br(brotli 설치 시) > gzip
+    MOCK_COMPRESS_MIN_SIZE=1024
+    MOCK_COMPRESS_LEVEL=1              # 빠른 압축이 기본 (대역폭 쪽을 보려는 용도)
+"""
+import gzip
+import os
+import random
+from typing import Dict, List, Optional
+
+from latency import LatencyModel, parse_model
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # 선택 의존성
+    brotli = None
+
+_ALNUM = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+# 바이트 0..255 → 영숫자 (62 로 나눈 나머지라 살짝 치우치지만 채움용으로는 충분)
+_TO_ALNUM = bytes(_ALNUM[i % len(_ALNUM)] for i in range(256))
+
+
+class FillerPool:
+    """한 번 만든 랜덤 영숫자 문자열에서 조각을 잘라 준다"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.buffer = os.urandom(size).translate(_TO_ALNUM).decode("ascii") if size else ""
+
+    def take(self, n: int, rng: random.Random) -> str:
+        n = max(0, min(n, self.size))
+        if n == 0:
+            return ""
+        start = rng.randrange(0, self.size - n + 1)
+        return self.buffer[start: start + n]
+
+
+class SizePolicy:
+    def __init__(
+        self,
+        default: Optional[LatencyModel],
+        overrides: Dict[str, LatencyModel],
+        max_bytes: int,
+        rng: Optional[random.Random] = None,
+    ):
+        self.default = default
+        self.overrides = overrides
+        self.max_bytes = max_bytes
+        self.rng = rng or random.Random()
+        self.pool = FillerPool(max_bytes if self.enabled else 0)
+
+    @property
+    def enabled(self) -> bool:
+        return self.default is not None or bool(self.overrides)
+
+    def sample(self, intent: str) -> int:
+        model = self.overrides.get(intent, self.default)
+        if model is None:
+            return 0
+        return max(0, min(int(model.sample(self.rng)), self.max_bytes))
+
+    def filler(self, intent: str) -> Optional[str]:
+        """의도별 크기만큼 채움 문자열 (모델이 없으면 None)"""
+        if not self.enabled:
+            return None
+        return self.pool.take(self.sample(intent), self.rng)
+
+    def describe(self) -> Optional[Dict[str, object]]:
+        if not self.enabled:
+            return None
+        return {
+            "default": self.default.describe() if self.default else None,
+            "intents": {k: v.describe() for k, v in self.overrides.items()},
+            "max_bytes": self.max_bytes,
+        }
+
+    @classmethod
+    def from_env(cls, rng: Optional[random.Random] = None) -> "SizePolicy":
+        spec = os.getenv("MOCK_RESPONSE_SIZE", "").strip()
+        default = parse_model(spec) if spec else None
+        overrides: Dict[str, LatencyModel] = {}
+        for item in os.getenv("MOCK_RESPONSE_SIZE_INTENTS", "").split(";"):
+            if not item.strip():
+                continue
+            intent, _, s = item.partition("=")
+            overrides[intent.strip()] = parse_model(s)
+        max_bytes = int(os.getenv("MOCK_RESPONSE_SIZE_MAX", str(16 * 1024 * 1024)))
+        return cls(default, overrides, max_bytes, rng)
+
+
+# ---------------------------
+# 압축 미들웨어
+# ---------------------------
+def _accepts(headers: List, encoding: str) -> bool:
+    for k, v in headers:
+        if k == b"accept-encoding":
+            return encoding in v.decode("latin-1").lower()
+    return False
+
+
+class CompressionMiddleware:
+    """
+    본문을 모아서 min_size 이상이면 gzip / br 로 압축.
+    스트리밍 응답(more_body)과 이미 Content-Encoding 이 있는 응답은 그대로 흘려보낸다.
+    """
+
+    def __init__(self, app, mode: str = "auto", min_size: int = 1024, level: int = 1):
+        self.app = app
+        self.mode = mode
+        self.min_size = min_size
+        self.level = level
+
+    def _choose(self, headers: List) -> Optional[str]:
+        if self.mode in ("br", "auto") and brotli is not None and _accepts(headers, "br"):
+            return "br"
+        if self.mode in ("gzip", "auto") and _accepts(headers, "gzip"):
+            return "gzip"
+        return None
+
+    def _compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.level)
+        return gzip.compress(body, compresslevel=self.level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.mode == "off":
+            return await self.app(scope, receive, send)
+        encoding = self._choose(scope["headers"])
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start: Dict = {}
+        passthrough = False
+
+        async def compress_send(message):
+            nonlocal passthrough
+            if message["type"] == "http.response.start":
+                start.update(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                return await send(message)
+
+            body = message.get("body", b"")
+            headers = start.get("headers", [])
+            already = any(k.lower() == b"content-encoding" for k, _ in headers)
+            if message.get("more_body", False) or already or len(body) < self.min_size:
+                passthrough = True
+                await send(start)
+                return await send(message)
+
+            body = self._compress(encoding, body)
+            headers = [(k, v) for k, v in headers if k.lower() != b"content-length"]
+            headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(body)).encode()),
+                (b"vary", b"Accept-Encoding"),
+            ]
+            start["headers"] = headers
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, compress_send)
+
+
+def install_compression(app) -> Optional[str]:
+    """MOCK_COMPRESS 설정대로 압축 미들웨어를 붙인다. 실제 모드 (꺼져 있으면 None)"""
+    mode = os.getenv("MOCK_COMPRESS", "off").lower()
+    if mode == "off":
+        return None
+    if mode == "br" and brotli is None:
+        raise RuntimeError("MOCK_COMPRESS=br requires the brotli package (pip install brotli)")
+    app.add_middleware(
+        CompressionMiddleware,
+        mode=mode,
+        min_size=int(os.getenv("MOCK_COMPRESS_MIN_SIZE", "1024")),
+        level=int(os.getenv("MOCK_COMPRESS_LEVEL", "1")),
+    )
+    return mode
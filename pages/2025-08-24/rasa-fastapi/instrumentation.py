@@ -0,0 +1,379 @@
+# instrumentation.py
+"""
+요청 구간별 시간 측정 / event loop 지연 / 샘플링 프로파일러
+2025-08-23/fastapi-n8n/instrumentation.py 에 같은 사본이 있음 (고치면 양쪽 다)
+
+    instr = install_instrumentation(app)   # 미들웨어를 다 붙인 뒤, 라우트를 선언하기 전에 호출
+
+요청 하나를 아래 구간으로 나눠 잰다 (단위: 초):
+    routing    미들웨어 진입 → 라우트 핸들러 진입 (CORS, 장애 주입 등 미들웨어 + 라우팅)
+    receive    요청 본문 읽기
+    validate   본문 파싱 + pydantic 검증 + 의존성 풀이 → 엔드포인트 함수 호출 직전
+    handler    엔드포인트 함수
+    serialize  반환값 → Response (jsonable_encoder + json 직렬화)
+    send       응답 전송 (스트리밍 응답이면 스트림 전체)
+결과는 미리 잡아 둔 고정 크기 링 버퍼(array('d'))에 쌓이고, 꽉 차면 가장 오래된 것부터 덮어쓴다.
+
+    GET /debug/timings?route=...&last=20      라우트별 구간 p50/p95/p99/max (+ 최근 원본)
+    GET /debug/profile?seconds=5&interval_ms=5&format=json|folded
+        event loop 스레드 스택을 N초간 샘플링 (folded 는 flamegraph.pl 입력 형식)
+"""
+import asyncio
+import contextvars
+import functools
+import math
+import os
+import sys
+import threading
+import time
+from array import array
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import PlainTextResponse
+from fastapi.routing import APIRoute
+
+PHASES = ("routing", "receive", "validate", "handler", "serialize", "send", "total")
+RING_SIZE = int(os.getenv("INSTR_RING_SIZE", "4096"))
+LAG_INTERVAL_S = 0.05  # loop lag 샘플 간격
+
+
+class _Timing:
+    __slots__ = ("route", "t0", "t_route", "t_body", "t_ep0", "t_ep1", "t_resp", "t_end")
+
+    def __init__(self, t0: float):
+        self.route: Optional[str] = None
+        self.t0 = t0
+        self.t_route = self.t_body = self.t_ep0 = self.t_ep1 = self.t_resp = self.t_end = 0.0
+
+    def phases(self) -> List[float]:
+        t_route = self.t_route or self.t0
+        t_body = max(self.t_body, t_route)
+        t_ep0 = self.t_ep0 or t_body
+        t_ep1 = self.t_ep1 or t_ep0
+        t_resp = self.t_resp or t_ep1
+        t_end = self.t_end or t_resp
+        return [
+            t_route - self.t0,
+            t_body - t_route,
+            t_ep0 - t_body,
+            t_ep1 - t_ep0,
+            t_resp - t_ep1,
+            t_end - t_resp,
+            t_end - self.t0,
+        ]
+
+
+_CURRENT: "contextvars.ContextVar[Optional[_Timing]]" = contextvars.ContextVar("instr_timing", default=None)
+
+
+# ---------------------------
+# 링 버퍼
+# ---------------------------
+class TimingRing:
+    """행 하나 = [구간 x len(PHASES)] + 라우트 번호. 모두 미리 할당."""
+
+    def __init__(self, capacity: int = RING_SIZE):
+        self.capacity = capacity
+        self.width = len(PHASES)
+        self.values = array("d", bytes(8 * capacity * self.width))
+        self.route_ids = array("H", bytes(2 * capacity))
+        self.routes: List[str] = []
+        self._route_index: Dict[str, int] = {}
+        self.written = 0
+
+    def push(self, route: str, phases: List[float]) -> None:
+        rid = self._route_index.get(route)
+        if rid is None:
+            rid = self._route_index[route] = len(self.routes)
+            self.routes.append(route)
+        row = self.written % self.capacity
+        self.route_ids[row] = rid
+        base = row * self.width
+        for i, v in enumerate(phases):
+            self.values[base + i] = v
+        self.written += 1
+
+    def rows(self, route: Optional[str] = None) -> List[int]:
+        """오래된 것부터 순서대로 행 번호"""
+        n = min(self.written, self.capacity)
+        start = self.written - n
+        rows = [(start + i) % self.capacity for i in range(n)]
+        if route is not None:
+            rid = self._route_index.get(route)
+            rows = [r for r in rows if self.route_ids[r] == rid]
+        return rows
+
+    def summary(self, route: Optional[str] = None) -> Dict[str, Any]:
+        by_route: Dict[int, List[int]] = {}
+        for r in self.rows(route):
+            by_route.setdefault(self.route_ids[r], []).append(r)
+
+        out: Dict[str, Any] = {}
+        for rid, rows in by_route.items():
+            phases: Dict[str, Any] = {}
+            for i, name in enumerate(PHASES):
+                vals = sorted(self.values[r * self.width + i] for r in rows)
+                phases[name] = {
+                    "p50_ms": _pct_ms(vals, 50),
+                    "p95_ms": _pct_ms(vals, 95),
+                    "p99_ms": _pct_ms(vals, 99),
+                    "max_ms": round(vals[-1] * 1000, 3),
+                }
+            out[self.routes[rid]] = {"count": len(rows), "phases": phases}
+        return out
+
+    def recent(self, last: int, route: Optional[str] = None) -> List[Dict[str, Any]]:
+        rows = self.rows(route)[-last:] if last > 0 else []
+        return [
+            {
+                "route": self.routes[self.route_ids[r]],
+                **{f"{name}_ms": round(self.values[r * self.width + i] * 1000, 3) for i, name in enumerate(PHASES)},
+            }
+            for r in rows
+        ]
+
+
+def _pct_ms(sorted_vals: List[float], p: float) -> float:
+    k = max(0, math.ceil(p / 100 * len(sorted_vals)) - 1)
+    return round(sorted_vals[k] * 1000, 3)
+
+
+# ---------------------------
+# event loop 지연
+# ---------------------------
+class LoopLagMonitor:
+    """interval 마다 깨어나서 예정보다 늦게 깨어난 만큼을 기록 (최근 window 초 최대값 유지)"""
+
+    def __init__(self, interval_s: float = LAG_INTERVAL_S, window_s: float = 1.0):
+        self.interval_s = interval_s
+        self.window_s = window_s
+        self.last_s = 0.0
+        self.max_s = 0.0
+        self._cur_max = 0.0
+        self._window_start = time.perf_counter()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            t = time.perf_counter()
+            await asyncio.sleep(self.interval_s)
+            now = time.perf_counter()
+            self.last_s = max(0.0, now - t - self.interval_s)
+            self._cur_max = max(self._cur_max, self.last_s)
+            if now - self._window_start >= self.window_s:
+                self.max_s, self._cur_max = self._cur_max, 0.0
+                self._window_start = now
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "loop_lag_ms": round(max(self.max_s, self._cur_max) * 1000, 3),
+            "loop_lag_last_ms": round(self.last_s * 1000, 3),
+        }
+
+
+# ---------------------------
+# 샘플링 프로파일러
+# ---------------------------
+class SamplingProfiler:
+    """다른 스레드에서 대상 스레드의 스택을 주기적으로 찍어 모은다 (한 번에 하나만)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    def run(self, thread_id: int, seconds: float, interval_s: float) -> Dict[str, Any]:
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("profiler already running")
+        try:
+            stacks: Counter = Counter()
+            samples = 0
+            deadline = time.perf_counter() + seconds
+            while time.perf_counter() < deadline:
+                frame = sys._current_frames().get(thread_id)
+                if frame is not None:
+                    names = []
+                    while frame is not None:
+                        code = frame.f_code
+                        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                        frame = frame.f_back
+                    stacks[";".join(reversed(names))] += 1
+                    samples += 1
+                time.sleep(interval_s)
+        finally:
+            self._lock.release()
+
+        leaf: Counter = Counter()
+        for stack, n in stacks.items():
+            leaf[stack.rsplit(";", 1)[-1]] += n
+        return {"samples": samples, "stacks": stacks, "leaf": leaf}
+
+
+# ---------------------------
+# 라우트 / 미들웨어
+# ---------------------------
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    # functools.wraps → FastAPI 는 __wrapped__ 의 시그니처로 파라미터를 풀이한다
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            rec = _CURRENT.get()
+            if rec is not None:
+                rec.t_ep0 = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                if rec is not None:
+                    rec.t_ep1 = time.perf_counter()
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            rec = _CURRENT.get()  # 스레드 풀로 넘어가도 컨텍스트는 복사됨 (같은 객체)
+            if rec is not None:
+                rec.t_ep0 = time.perf_counter()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                if rec is not None:
+                    rec.t_ep1 = time.perf_counter()
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        route = self.path
+
+        async def timed_handler(request):
+            rec = _CURRENT.get()
+            if rec is not None:
+                rec.route = route
+                rec.t_route = time.perf_counter()
+            response = await handler(request)
+            if rec is not None:
+                rec.t_resp = time.perf_counter()
+            return response
+
+        return timed_handler
+
+
+class InstrumentationMiddleware:
+    """가장 바깥 ASGI 층: 요청마다 _Timing 을 만들고 본문 수신/응답 전송 시각을 기록"""
+
+    def __init__(self, app, instr: "Instrumentation"):
+        self.app = app
+        self.instr = instr
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self.app(scope, self._lifespan_receive(receive), send)
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        rec = _Timing(time.perf_counter())
+        token = _CURRENT.set(rec)
+
+        async def timed_receive():
+            message = await receive()
+            if message["type"] == "http.request" and not message.get("more_body", False):
+                rec.t_body = time.perf_counter()
+            return message
+
+        async def timed_send(message):
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                rec.t_end = time.perf_counter()
+
+        try:
+            await self.app(scope, timed_receive, timed_send)
+        finally:
+            _CURRENT.reset(token)
+            if rec.route is not None:
+                self.instr.ring.push(rec.route, rec.phases())
+
+    def _lifespan_receive(self, receive):
+        # 앱 자체 lifespan 과 상관없이 loop lag 측정 태스크를 켜고 끈다
+        async def wrapped():
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.instr.loop_lag.start()
+            elif message["type"] == "lifespan.shutdown":
+                self.instr.loop_lag.stop()
+            return message
+
+        return wrapped
+
+
+class Instrumentation:
+    def __init__(self, capacity: int = RING_SIZE):
+        self.ring = TimingRing(capacity)
+        self.loop_lag = LoopLagMonitor()
+        self.profiler = SamplingProfiler()
+
+
+def install_instrumentation(app, capacity: int = RING_SIZE) -> Instrumentation:
+    """
+    측정 미들웨어를 가장 바깥에 붙이고 이후 선언되는 라우트를 TimedRoute 로 만든다.
+    다른 미들웨어를 모두 붙인 뒤, 측정할 라우트를 선언하기 전에 호출.
+    """
+    instr = Instrumentation(capacity)
+    app.add_middleware(InstrumentationMiddleware, instr=instr)
+
+    @app.get("/debug/timings")
+    async def debug_timings(route: Optional[str] = None, last: int = 0):
+        return {
+            "ring": {"capacity": instr.ring.capacity, "recorded": instr.ring.written},
+            **instr.loop_lag.snapshot(),
+            "routes": instr.ring.summary(route),
+            "recent": instr.ring.recent(last, route),
+        }
+
+    @app.get("/debug/profile")
+    async def debug_profile(seconds: float = 5.0, interval_ms: float = 5.0, format: str = "json", top: int = 30):
+        if instr.profiler.busy:
+            raise HTTPException(status_code=409, detail="profiler already running")
+        seconds = min(max(seconds, 0.1), 60.0)
+        interval_s = max(interval_ms, 0.5) / 1000.0
+        loop_thread = threading.get_ident()
+        try:
+            result = await asyncio.to_thread(instr.profiler.run, loop_thread, seconds, interval_s)
+        except RuntimeError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+
+        if format == "folded":
+            text = "".join(f"{stack} {n}\n" for stack, n in result["stacks"].most_common())
+            return PlainTextResponse(text)
+        total = max(1, result["samples"])
+        return {
+            "seconds": seconds,
+            "interval_ms": interval_s * 1000,
+            "samples": result["samples"],
+            "top_leaf": [
+                {"frame": f, "samples": n, "pct": round(100 * n / total, 1)}
+                for f, n in result["leaf"].most_common(top)
+            ],
+            "top_stacks": [
+                {"stack": s.split(";"), "samples": n, "pct": round(100 * n / total, 1)}
+                for s, n in result["stacks"].most_common(top)
+            ],
+        }
+
+    # 위 디버그 라우트는 측정하지 않음
+    app.router.route_class = TimedRoute
+    return instr
@@ -0,0 +1,176 @@
+# intent_config.py
+"""
+의도 설정 핫 리로드 (재시작 없이)
+
+MOCK_INTENT_CONFIG=intent_config.example.json 처럼 JSON 파일을 주면:
+    {
+      "intent_keywords": [["order_tracking", ["order", "주문"]], ...],   # 또는 {"order_tracking": [...], ...}
+      "default_intent": "faq_general",
+      "perturb_prob": 0.15,
+      "candidate_messages": ["...", ...]
+    }
+빠진 키는 mock_server 의 기본 상수를 그대로 쓴다.
+
+- 백그라운드 태스크가 poll_s 마다 파일 mtime/크기를 보고, 바뀌었으면
+  스레드에서 파일을 읽고 매처(IntentMatcher)를 새로 컴파일한 뒤 current 를 통째로 바꿔 끼운다.
+- IntentConfig 는 만든 뒤 바꾸지 않는 스냅샷. 요청은 시작할 때 current 를 한 번 잡아서 끝까지 쓰므로
+  처리 중이던 요청은 이전 버전으로 끝난다.
+- 파일이 깨져 있으면 이전 버전을 유지하고 last_error 에 남긴다.
+- version: "<로드 번호>-<내용 sha1 앞 8자>" (기본 상수는 "builtin")
+- on_change(cfg): 새 버전으로 바꿔 끼울 때마다 호출 (mock_server 는 의도 메트릭 라벨을 추가)
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from intent_matcher import IntentMatcher, IntentTable
+
+
+class IntentConfig:
+    """한 버전의 의도 설정 + 컴파일된 매처 (불변으로 취급)"""
+
+    def __init__(
+        self,
+        intent_keywords: IntentTable,
+        default_intent: str,
+        perturb_prob: float,
+        candidate_messages: Sequence[str],
+        version: str,
+    ):
+        if not 0.0 <= perturb_prob <= 1.0:
+            raise ValueError(f"perturb_prob must be within [0, 1], got {perturb_prob}")
+        if not candidate_messages:
+            raise ValueError("candidate_messages must not be empty")
+        self.intent_keywords: List[Tuple[str, List[str]]] = [(i, list(k)) for i, k in intent_keywords]
+        self.default_intent = default_intent
+        self.perturb_prob = perturb_prob
+        self.candidate_messages: List[str] = list(candidate_messages)
+        self.version = version
+        self.matcher = IntentMatcher(self.intent_keywords, default_intent)
+        self.intents: List[str] = [i for i, _ in self.intent_keywords] + [default_intent]
+        self.loaded_at = time.time()
+
+    def perturb_pool(self, intent: str) -> List[str]:
+        return [i for i in self.intents if i != intent]
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "intents": self.intents,
+            "keywords": sum(len(k) for _, k in self.intent_keywords),
+            "perturb_prob": self.perturb_prob,
+            "candidate_messages": len(self.candidate_messages),
+            "loaded_at": self.loaded_at,
+        }
+
+
+def _str_list(value: Any, what: str) -> List[str]:
+    """문자열 리스트인지 확인 ("hello" 같은 문자열 하나가 글자 단위 키워드로 풀리지 않게)"""
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError(f"{what} must be a list of strings, got {value!r}")
+    return list(value)
+
+
+def _parse(raw: bytes, base: IntentConfig, version: str) -> IntentConfig:
+    data = json.loads(raw)
+    if not isinstance(data, dict):
+        raise ValueError("config must be a JSON object")
+    table = data.get("intent_keywords", base.intent_keywords)
+    if isinstance(table, dict):
+        table = list(table.items())  # JSON 객체 순서 = 우선순위
+    return IntentConfig(
+        [(str(intent), _str_list(keys, f"intent_keywords[{intent!r}]")) for intent, keys in table],
+        str(data.get("default_intent", base.default_intent)),
+        float(data.get("perturb_prob", base.perturb_prob)),
+        _str_list(data.get("candidate_messages", base.candidate_messages), "candidate_messages"),
+        version,
+    )
+
+
+class IntentConfigWatcher:
+    def __init__(
+        self,
+        builtin: IntentConfig,
+        path: Optional[str] = None,
+        poll_s: float = 1.0,
+        on_change: Optional[Callable[[IntentConfig], None]] = None,
+    ):
+        self.builtin = builtin
+        self.current = builtin
+        self.path = path
+        self.poll_s = poll_s
+        self.on_change = on_change  # 새 버전으로 바꿔 끼울 때마다 (메트릭 라벨 추가 등)
+        self.loads = 0
+        self.last_error: Optional[str] = None
+        self._stamp: Optional[Tuple[float, int]] = None
+        self._task: Optional[asyncio.Task] = None
+        if path:
+            self.reload()  # 시작 시에는 동기로 (파일이 깨져 있으면 바로 알 수 있게)
+            if self.last_error:
+                raise ValueError(f"{path}: {self.last_error}")
+
+    def _file_stamp(self) -> Optional[Tuple[float, int]]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime, st.st_size)
+
+    def _build(self) -> Optional[IntentConfig]:
+        """파일을 읽어 새 버전을 만든다 (바뀐 게 없으면 None). 스레드에서 돌려도 됨"""
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return None
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        self._stamp = stamp
+        digest = hashlib.sha1(raw).hexdigest()[:8]
+        if digest == self.current.version.rpartition("-")[2]:
+            self.last_error = None  # touch 만 됐거나 깨졌던 파일이 원래대로 돌아옴
+            return None
+        return _parse(raw, self.builtin, f"{self.loads + 1}-{digest}")
+
+    def _swap(self, cfg: Optional[IntentConfig]) -> None:
+        if cfg is not None:
+            self.current = cfg  # 참조 하나 교체 → 원자적
+            self.loads += 1
+            self.last_error = None
+            if self.on_change:
+                self.on_change(cfg)
+
+    def reload(self) -> bool:
+        before = self.current
+        try:
+            self._swap(self._build())
+        except (OSError, ValueError, TypeError) as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+        return self.current is not before
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_s)
+            try:
+                self._swap(await asyncio.to_thread(self._build))
+            except (OSError, ValueError, TypeError) as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+
+    def start(self) -> None:
+        if self.path and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "poll_s": self.poll_s if self.path else None,
+            "loads": self.loads,
+            "last_error": self.last_error,
+            **self.current.describe(),
+        }
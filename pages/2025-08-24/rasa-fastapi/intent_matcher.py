@@ -0,0 +1,211 @@
+# intent_matcher.py
+"""
+키워드 → 의도 매칭기 (Aho-Corasick)
+
+INTENT_KEYWORDS 테이블을 서버 시작 시 한 번만 오토마톤으로 컴파일해 두고,
+메시지를 한 번만 훑어서 모든 키워드 히트를 찾는다.
+- 우선순위: 테이블 순서 그대로 (먼저 나온 의도가 이김, 기존 동작과 동일)
+- 디버깅용으로 매칭된 의도 전체 목록도 돌려줌
+
+pyahocorasick(C 구현)이 설치되어 있으면 그걸 쓰고, 없으면 순수 파이썬 오토마톤을 쓴다.
+    pip install pyahocorasick   # 선택
+
+벤치마크:
+    python intent_matcher.py [--keywords-per-intent 1000] [--iterations 20000]
+"""
+from typing import Dict, List, Sequence, Tuple
+
+try:
+    import ahocorasick  # type: ignore
+except ImportError:  # 선택 의존성
+    ahocorasick = None
+
+
+IntentTable = Sequence[Tuple[str, Sequence[str]]]
+
+
+class IntentMatcher:
+    """컴파일된 다중 패턴 의도 매칭기.
+
+    각 상태의 출력은 "의도 우선순위 비트마스크"로 저장한다.
+    메시지를 훑으며 마스크를 OR 하고, 최하위 비트가 곧 최우선 의도.
+    """
+
+    def __init__(self, intent_keywords: IntentTable, default_intent: str):
+        self.default_intent = default_intent
+        self.intents: List[str] = [intent for intent, _ in intent_keywords]
+
+        # 같은 키워드가 여러 의도에 걸려 있으면 마스크를 합쳐 둔다
+        masks: Dict[str, int] = {}
+        for idx, (_, keys) in enumerate(intent_keywords):
+            for k in keys:
+                k = k.lower()
+                if k:
+                    masks[k] = masks.get(k, 0) | (1 << idx)
+
+        self._automaton = None
+        if ahocorasick is not None and masks:
+            auto = ahocorasick.Automaton()
+            for k, mask in masks.items():
+                auto.add_word(k, mask)
+            auto.make_automaton()
+            self._automaton = auto
+        else:
+            self._build(masks)
+
+    # ---------------------------
+    # 순수 파이썬 오토마톤
+    # ---------------------------
+    def _build(self, masks: Dict[str, int]) -> None:
+        goto: List[Dict[str, int]] = [{}]
+        out: List[int] = [0]
+
+        for word, mask in masks.items():
+            state = 0
+            for ch in word:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append(0)
+                state = nxt
+            out[state] |= mask
+
+        # BFS로 실패 링크를 만들고, 출력 마스크를 실패 경로를 따라 합친다
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                cand = goto[f].get(ch, 0)
+                fail[nxt] = cand if cand != nxt else 0
+                out[nxt] |= out[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def _scan(self, text: str) -> int:
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        mask = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            mask |= out[state]
+        return mask
+
+    def hit_mask(self, message: str) -> int:
+        """메시지에서 히트한 의도들의 우선순위 비트마스크"""
+        text = message.lower()
+        if self._automaton is not None:
+            mask = 0
+            for _, m in self._automaton.iter(text):
+                mask |= m
+            return mask
+        return self._scan(text)
+
+    # ---------------------------
+    # 공개 API
+    # ---------------------------
+    def pick(self, message: str) -> str:
+        """첫 번째(최우선) 매칭 의도, 없으면 DEFAULT_INTENT"""
+        mask = self.hit_mask(message)
+        if not mask:
+            return self.default_intent
+        return self.intents[(mask & -mask).bit_length() - 1]
+
+    def match_all(self, message: str) -> List[str]:
+        """매칭된 의도 전체 (우선순위 순서). 디버깅용."""
+        mask = self.hit_mask(message)
+        return [intent for idx, intent in enumerate(self.intents) if mask >> idx & 1]
+
+    def pick_with_matches(self, message: str) -> Tuple[str, List[str]]:
+        """(최우선 의도, 매칭된 의도 전체)를 한 번의 스캔으로"""
+        mask = self.hit_mask(message)
+        matches = [intent for idx, intent in enumerate(self.intents) if mask >> idx & 1]
+        return (matches[0] if matches else self.default_intent), matches
+
+
+# ---------------------------
+# Microbenchmark
+# ---------------------------
+def _legacy_pick(intent_keywords: IntentTable, default_intent: str, message: str) -> str:
+    # 기존 mock_server.pick_intent_by_keywords 구현 그대로 (비교 기준)
+    msg_lower = message.lower()
+    for intent, keys in intent_keywords:
+        if any(k.lower() in msg_lower for k in keys):
+            return intent
+    return default_intent
+
+
+def _bench() -> None:
+    import argparse
+    import random
+    import string
+    import time
+
+    from mock_server import DEFAULT_INTENT, INTENT_KEYWORDS
+
+    parser = argparse.ArgumentParser(description="IntentMatcher vs legacy keyword scan")
+    parser.add_argument("--keywords-per-intent", type=int, default=1000,
+                        help="의도별로 덧붙일 합성 키워드 수 (0이면 원본 테이블만)")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    table = [
+        (intent, list(keys) + [
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(6, 12)))
+            for _ in range(args.keywords_per_intent)
+        ])
+        for intent, keys in INTENT_KEYWORDS
+    ]
+    messages = [
+        "안녕하세요 주문한 상품 배송 언제 오나요?",
+        "I want a refund for my order please",
+        "hello there",
+        "카탈로그에서 product master 정보 좀",
+        "what is the weather like today in seoul",
+        "goodbye and thanks",
+    ]
+    workload = [messages[i % len(messages)] for i in range(args.iterations)]
+
+    t0 = time.perf_counter()
+    matcher = IntentMatcher(table, DEFAULT_INTENT)
+    compile_s = time.perf_counter() - t0
+
+    # 결과가 기존 구현과 같은지 먼저 확인
+    for msg in messages:
+        assert matcher.pick(msg) == _legacy_pick(table, DEFAULT_INTENT, msg), msg
+
+    t0 = time.perf_counter()
+    for msg in workload:
+        _legacy_pick(table, DEFAULT_INTENT, msg)
+    legacy_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for msg in workload:
+        matcher.pick(msg)
+    compiled_s = time.perf_counter() - t0
+
+    n_keys = sum(len(keys) for _, keys in table)
+    backend = "pyahocorasick" if matcher._automaton is not None else "pure-python"
+    print(f"keywords={n_keys} iterations={args.iterations} backend={backend}")
+    print(f"compile      : {compile_s * 1e3:8.2f} ms (1회)")
+    print(f"legacy scan  : {legacy_s / args.iterations * 1e6:8.2f} us/msg")
+    print(f"IntentMatcher: {compiled_s / args.iterations * 1e6:8.2f} us/msg "
+          f"(x{legacy_s / compiled_s:.1f})")
+
+
+if __name__ == "__main__":
+    _bench()
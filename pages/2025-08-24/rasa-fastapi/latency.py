@@ -0,0 +1,197 @@
+# latency.py
+"""
+웹훅 지연(latency) 모델
+
+실행마다 환경변수로 고른다:
+    MOCK_LATENCY="uniform:0.3,2.0"                 # 기본값 (기존 동작)
+    MOCK_LATENCY_INTENTS="product_master_data=lognormal:1.2,0.6;greeting=fixed:0.2"
+    MOCK_SEED=42                                   # 재현 가능한 실행
+
+스펙 문법 (단위: 초):
+    fixed:S
+    uniform:LO,HI
+    lognormal:MEDIAN,SIGMA[,MAX]     # 중앙값 MEDIAN, 로그 표준편차 SIGMA
+    pareto:SCALE,ALPHA[,MAX]         # 최소 SCALE, 꼬리 지수 ALPHA (작을수록 긴 꼬리)
+    empirical:PATH                   # 히스토그램 파일 재생
+
+empirical 파일 형식 (#은 주석, 구분자는 콤마/공백):
+    0.10,0.20,530      # LO,HI,COUNT  → 버킷을 가중치로 고르고 구간 안에서 균등
+    0.734              # 값 하나      → 관측값 그대로 재생
+"""
+import bisect
+import math
+import os
+import random
+import re
+from typing import Dict, List, Optional
+
+
+class LatencyModel:
+    name = "base"
+
+    def sample(self, rng: random.Random) -> float:
+        raise NotImplementedError
+
+    def describe(self) -> str:
+        return self.name
+
+
+class FixedLatency(LatencyModel):
+    name = "fixed"
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def sample(self, rng: random.Random) -> float:
+        return self.seconds
+
+    def describe(self) -> str:
+        return f"fixed:{self.seconds}"
+
+
+class UniformLatency(LatencyModel):
+    name = "uniform"
+
+    def __init__(self, lo: float, hi: float):
+        self.lo, self.hi = lo, hi
+
+    def sample(self, rng: random.Random) -> float:
+        return rng.uniform(self.lo, self.hi)
+
+    def describe(self) -> str:
+        return f"uniform:{self.lo},{self.hi}"
+
+
+class LogNormalLatency(LatencyModel):
+    name = "lognormal"
+
+    def __init__(self, median: float, sigma: float, cap: Optional[float] = None):
+        self.median, self.sigma, self.cap = median, sigma, cap
+        self._mu = math.log(median)
+
+    def sample(self, rng: random.Random) -> float:
+        d = rng.lognormvariate(self._mu, self.sigma)
+        return min(d, self.cap) if self.cap is not None else d
+
+    def describe(self) -> str:
+        cap = f",{self.cap}" if self.cap is not None else ""
+        return f"lognormal:{self.median},{self.sigma}{cap}"
+
+
+class ParetoLatency(LatencyModel):
+    name = "pareto"
+
+    def __init__(self, scale: float, alpha: float, cap: Optional[float] = None):
+        self.scale, self.alpha, self.cap = scale, alpha, cap
+
+    def sample(self, rng: random.Random) -> float:
+        d = self.scale * rng.paretovariate(self.alpha)
+        return min(d, self.cap) if self.cap is not None else d
+
+    def describe(self) -> str:
+        cap = f",{self.cap}" if self.cap is not None else ""
+        return f"pareto:{self.scale},{self.alpha}{cap}"
+
+
+class EmpiricalLatency(LatencyModel):
+    """히스토그램/관측값 파일을 재생. 누적 가중치 + bisect로 O(log n) 샘플링."""
+
+    name = "empirical"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lo: List[float] = []
+        self._hi: List[float] = []
+        self._cum: List[float] = []
+
+        total = 0.0
+        with open(path, "r", encoding="utf-8") as f:
+            for lineno, line in enumerate(f, 1):
+                line = line.split("#", 1)[0].strip()
+                if not line:
+                    continue
+                nums = [float(x) for x in re.split(r"[,\s]+", line) if x]
+                if len(nums) == 1:
+                    lo = hi = nums[0]
+                    count = 1.0
+                elif len(nums) == 3:
+                    lo, hi, count = nums
+                else:
+                    raise ValueError(f"{path}:{lineno}: expected 'value' or 'lo,hi,count'")
+                if count <= 0:
+                    continue
+                total += count
+                self._lo.append(lo)
+                self._hi.append(hi)
+                self._cum.append(total)
+
+        if not self._cum:
+            raise ValueError(f"{path}: empty latency histogram")
+        self._total = total
+
+    def sample(self, rng: random.Random) -> float:
+        i = bisect.bisect_right(self._cum, rng.random() * self._total)
+        i = min(i, len(self._cum) - 1)
+        lo, hi = self._lo[i], self._hi[i]
+        return lo if lo == hi else rng.uniform(lo, hi)
+
+    def describe(self) -> str:
+        return f"empirical:{self.path}"
+
+
+def parse_model(spec: str) -> LatencyModel:
+    kind, _, args = spec.strip().partition(":")
+    kind = kind.strip().lower()
+    if kind == "empirical":
+        return EmpiricalLatency(args.strip())
+
+    nums = [float(x) for x in args.split(",") if x.strip()]
+    try:
+        if kind == "fixed":
+            (seconds,) = nums
+            return FixedLatency(seconds)
+        if kind == "uniform":
+            lo, hi = nums
+            return UniformLatency(lo, hi)
+        if kind == "lognormal":
+            return LogNormalLatency(*nums)
+        if kind == "pareto":
+            return ParetoLatency(*nums)
+    except (TypeError, ValueError):
+        raise ValueError(f"bad arguments for latency model: {spec!r}") from None
+    raise ValueError(f"unknown latency model: {spec!r}")
+
+
+class LatencyPolicy:
+    """기본 모델 + 의도별 오버라이드. 모든 샘플은 하나의 (시드 고정 가능한) rng에서."""
+
+    def __init__(
+        self,
+        default: LatencyModel,
+        overrides: Optional[Dict[str, LatencyModel]] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        self.default = default
+        self.overrides = overrides or {}
+        self.rng = rng or random.Random()
+
+    def sample(self, intent: Optional[str] = None) -> float:
+        model = self.overrides.get(intent, self.default) if intent else self.default
+        return max(0.0, model.sample(self.rng))
+
+    def describe(self) -> Dict[str, object]:
+        return {
+            "default": self.default.describe(),
+            "intents": {k: m.describe() for k, m in self.overrides.items()},
+        }
+
+    @classmethod
+    def from_env(cls, rng: Optional[random.Random] = None) -> "LatencyPolicy":
+        default = parse_model(os.getenv("MOCK_LATENCY", "uniform:0.3,2.0"))
+        overrides: Dict[str, LatencyModel] = {}
+        for item in os.getenv("MOCK_LATENCY_INTENTS", "").split(";"):
+            if not item.strip():
+                continue
+            intent, _, spec = item.partition("=")
+            overrides[intent.strip()] = parse_model(spec)
+        return cls(default, overrides, rng)
@@ -0,0 +1,514 @@
+# loadgen.py
+"""
+헤드리스 부하 생성기 (rasa-test-ui RequestQueue의 파이썬 버전)
+
+UI에 붙여넣던 것과 같은 형식의 파일을 읽는다 (한 줄 = 한 질문, `--의도` 가 정답):
+    주문한 상품 언제 와요? --order_tracking
+    환불 규정 알려줘 --refund_policy
+
+    pip install httpx
+    python loadgen.py questions.txt -c 50 --repeat 10
+    python loadgen.py questions.txt -c 3 --timeout 30 --retries 3 --retry-delay 1.0 --json
+
+기본값은 UI config.js 와 같다 (maxConcurrent=3, timeout=30s, retryAttempts=3, retryDelay=1s).
+
+오픈 루프 (도착률 고정) 모드 — 서버가 느려져도 보내는 속도를 줄이지 않는다:
+    python loadgen.py questions.txt --rate 200 --arrival poisson --repeat 100
+    python loadgen.py questions.txt --trace arrivals.txt --trace-speed 2.0
+지연은 "실제로 보낸 시각"이 아니라 "보냈어야 하는 시각"부터 잰다 (coordinated omission 보정).
+리포트의 분위수는 HDR 스타일 로그-선형 히스토그램에서 계산한다 (--hdr 로 전체 분포 출력).
+
+스트리밍 웹훅(/stream?format=ndjson)으로 첫 메시지까지의 시간(TTFM)도 잴 수 있다:
+    python loadgen.py questions.txt --stream -c 20
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import string
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+DEFAULT_URL = "http://localhost:30916/webhooks/myio/webhook"
+
+# utils.js MessageParser 와 같은 규칙
+GROUND_TRUTH_RE = re.compile(r"--([a-zA-Z0-9_]+)")
+# api.js parseResponse: current_flow 가 없으면 이 값으로 간주
+FALLBACK_INTENT = "product_master_data"
+
+
+@dataclass
+class Question:
+    message: str
+    ground_truth: Optional[str]
+
+
+@dataclass
+class Result:
+    ground_truth: Optional[str]
+    intent_answer: Optional[str]
+    verdict: str                   # OK / NG / None
+    latency_s: float
+    server_elapsed_s: Optional[float]
+    attempts: int
+    error: Optional[str] = None
+    # 실제 전송 시각부터의 지연 (오픈 루프에서 latency_s 는 예정 시각부터)
+    service_s: Optional[float] = None
+    send_lag_s: float = 0.0
+    # --stream: 실제 전송 시각부터 첫 메시지 조각을 받을 때까지
+    ttfm_s: Optional[float] = None
+
+
+# ---------------------------
+# HDR 스타일 히스토그램
+# ---------------------------
+class HdrHistogram:
+    """
+    HdrHistogram 과 같은 로그-선형 버킷 (정수 마이크로초 단위).
+    2의 거듭제곱 구간마다 같은 개수의 하위 버킷을 두어, 어느 크기에서든
+    상대 오차가 유효숫자 sig_figs 자리 이내로 유지된다. 메모리는 값의 범위에만 비례.
+    """
+
+    def __init__(self, sig_figs: int = 3, unit: float = 1e-6):
+        self.unit = unit
+        self.sub_bits = max(1, math.ceil(math.log2(2 * 10 ** sig_figs)))
+        self.sub_count = 1 << self.sub_bits
+        self.half = self.sub_count >> 1
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+        self.min_v: Optional[int] = None
+        self.max_v = 0
+        self.sum_v = 0
+
+    def _index(self, v: int) -> int:
+        if v < self.sub_count:
+            return v
+        shift = v.bit_length() - self.sub_bits
+        return self.sub_count + (shift - 1) * self.half + ((v >> shift) - self.half)
+
+    def _highest_equivalent(self, idx: int) -> int:
+        if idx < self.sub_count:
+            return idx
+        k = idx - self.sub_count
+        shift = k // self.half + 1
+        lower = (k % self.half + self.half) << shift
+        return lower + (1 << shift) - 1
+
+    def record(self, seconds: float) -> None:
+        v = max(0, int(round(seconds / self.unit)))
+        idx = self._index(v)
+        self.counts[idx] = self.counts.get(idx, 0) + 1
+        self.total += 1
+        self.sum_v += v
+        self.max_v = max(self.max_v, v)
+        self.min_v = v if self.min_v is None else min(self.min_v, v)
+
+    def value_at_percentile(self, pct: float) -> Optional[float]:
+        if not self.total:
+            return None
+        target = max(1, math.ceil(pct / 100.0 * self.total))
+        seen = 0
+        for idx in sorted(self.counts):
+            seen += self.counts[idx]
+            if seen >= target:
+                return min(self._highest_equivalent(idx), self.max_v) * self.unit
+        return self.max_v * self.unit
+
+    def percentile_distribution(self, ticks_per_half: int = 5) -> List[Dict[str, float]]:
+        """HdrHistogram outputPercentileDistribution 과 같은 반감 간격 분위수 표"""
+        rows = []
+        if not self.total:
+            return rows
+        pct = 0.0
+        step = 50.0 / ticks_per_half
+        remaining = 50.0
+        while pct < 100.0 and remaining > 1e-9:
+            v = self.value_at_percentile(pct)
+            rows.append({"percentile": pct, "value_s": v})
+            pct += step
+            if pct >= 100.0 - remaining:
+                remaining /= 2
+                step = remaining / ticks_per_half
+        rows.append({"percentile": 100.0, "value_s": self.max_v * self.unit})
+        return rows
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        return {
+            "count": self.total,
+            "mean": (self.sum_v / self.total * self.unit) if self.total else None,
+            "p50": self.value_at_percentile(50),
+            "p95": self.value_at_percentile(95),
+            "p99": self.value_at_percentile(99),
+            "p999": self.value_at_percentile(99.9),
+            "max": (self.max_v * self.unit) if self.total else None,
+        }
+
+
+# ---------------------------
+# UI 로직 미러링
+# ---------------------------
+def parse_ground_truth(line: str) -> Optional[str]:
+    match = GROUND_TRUTH_RE.search(line)
+    return match.group(1) if match else None
+
+
+def clean_message(line: str) -> str:
+    return GROUND_TRUTH_RE.sub("", line, count=1).strip()
+
+
+def load_questions(lines: Sequence[str]) -> List[Question]:
+    return [
+        Question(clean_message(line), parse_ground_truth(line))
+        for line in lines
+        if line.strip()
+    ]
+
+
+def parse_intent(data: Dict[str, Any]) -> str:
+    flows = data.get("flows") if isinstance(data, dict) else None
+    for flow in flows if isinstance(flows, list) else []:
+        slot = flow.get("set_slot") if isinstance(flow, dict) else None
+        if isinstance(slot, str) and slot.startswith("current_flow="):
+            return slot.split("=", 1)[1]
+    return FALLBACK_INTENT
+
+
+def evaluate_result(ground_truth: Optional[str], intent_answer: Optional[str]) -> str:
+    if not ground_truth:
+        return "None"
+    return "OK" if ground_truth == intent_answer else "NG"
+
+
+def generate_sender_id(mode: str, fixed_sender: str) -> str:
+    if mode == "fixed":
+        return fixed_sender
+    return "usr_" + "".join(random.choices(string.ascii_lowercase + string.digits, k=6))
+
+
+# ---------------------------
+# 요청 실행
+# ---------------------------
+async def fetch_stream(
+    client: httpx.AsyncClient, url: str, payload: Dict[str, Any], t_send: float
+) -> Tuple[Dict[str, Any], Optional[float]]:
+    """스트리밍 웹훅 응답을 모아 단건 응답과 같은 모양으로 + 첫 메시지 도착 시간"""
+    ttfm: Optional[float] = None
+    data: Dict[str, Any] = {"messages": []}
+    async with client.stream("POST", url + "/stream", params={"format": "ndjson"}, json=payload) as resp:
+        resp.raise_for_status()
+        async for line in resp.aiter_lines():
+            if not line:
+                continue
+            event = json.loads(line)
+            kind = event.pop("type", None)
+            if kind == "message":
+                if ttfm is None:
+                    ttfm = time.perf_counter() - t_send
+                data["messages"].append(event)
+            elif kind == "done":
+                data.update(event)
+    return data, ttfm
+
+
+async def send_one(
+    client: httpx.AsyncClient,
+    url: str,
+    q: Question,
+    sender: str,
+    retries: int,
+    retry_delay: float,
+    intended: Optional[float] = None,
+    stream: bool = False,
+) -> Result:
+    payload = {"sender": sender, "message": q.message, "metadata": {}}
+    t_send = time.perf_counter()
+    # 오픈 루프: 예정 시각부터 잰다 (스케줄러가 밀린 시간도 지연에 포함)
+    t0 = intended if intended is not None else t_send
+    error: Optional[str] = None
+    attempts = 0
+
+    for attempt in range(retries + 1):
+        attempts = attempt + 1
+        try:
+            ttfm = None
+            if stream:
+                data, ttfm = await fetch_stream(client, url, payload, t_send)
+            else:
+                resp = await client.post(url, json=payload)
+                resp.raise_for_status()
+                data = resp.json()
+            intent = parse_intent(data)
+            metrics = data.get("server_metrics") or {}
+            t_end = time.perf_counter()
+            return Result(
+                ground_truth=q.ground_truth,
+                intent_answer=intent,
+                verdict=evaluate_result(q.ground_truth, intent),
+                latency_s=t_end - t0,
+                server_elapsed_s=metrics.get("elapsed_s"),
+                attempts=attempts,
+                service_s=t_end - t_send,
+                send_lag_s=t_send - t0,
+                ttfm_s=ttfm,
+            )
+        except (httpx.HTTPError, ValueError) as e:
+            error = f"{type(e).__name__}: {e}"
+            if attempt < retries:
+                await asyncio.sleep(retry_delay)
+
+    # UI와 동일하게 실패는 NG로 집계
+    return Result(
+        ground_truth=q.ground_truth,
+        intent_answer=None,
+        verdict="NG",
+        latency_s=time.perf_counter() - t0,
+        server_elapsed_s=None,
+        attempts=attempts,
+        error=error,
+        service_s=time.perf_counter() - t_send,
+        send_lag_s=t_send - t0,
+    )
+
+
+def make_client(max_connections: int, args: argparse.Namespace) -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+    )
+    timeout = httpx.Timeout(args.timeout, connect=args.connect_timeout)
+    return httpx.AsyncClient(limits=limits, timeout=timeout)
+
+
+async def run_closed_loop(args: argparse.Namespace, questions: List[Question]) -> Dict[str, Any]:
+    """동시성 N 고정 (UI RequestQueue 와 같은 방식): 응답이 와야 다음 요청을 보냄"""
+    queue: "asyncio.Queue[Question]" = asyncio.Queue()
+    for _ in range(args.repeat):
+        for q in questions:
+            queue.put_nowait(q)
+
+    results: List[Result] = []
+    fixed_sender = generate_sender_id("random", "")
+
+    async with make_client(args.concurrency, args) as client:
+        async def worker() -> None:
+            while True:
+                try:
+                    q = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                sender = generate_sender_id(args.sender_mode, fixed_sender)
+                results.append(
+                    await send_one(
+                        client, args.url, q, sender, args.retries, args.retry_delay,
+                        stream=args.stream,
+                    )
+                )
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        wall_s = time.perf_counter() - t0
+
+    report = build_report(results, wall_s, hdr=args.hdr)
+    report["mode"] = "closed"
+    report["concurrency"] = args.concurrency
+    return report
+
+
+# ---------------------------
+# 오픈 루프 (도착률 고정)
+# ---------------------------
+def arrival_offsets(args: argparse.Namespace, n: int) -> List[float]:
+    """시작 시각 기준 각 요청의 예정 전송 시각 (초)"""
+    if args.trace:
+        with open(args.trace, "r", encoding="utf-8") as f:
+            stamps = []
+            for line in f:
+                line = line.split("#", 1)[0].strip()
+                if line:
+                    stamps.append(float(re.split(r"[,\s]+", line)[0]))
+        if not stamps:
+            raise ValueError(f"{args.trace}: empty trace")
+        stamps.sort()
+        base = stamps[0]
+        return [(t - base) / args.trace_speed for t in stamps]
+
+    if args.arrival == "poisson":
+        rng = random.Random(args.seed)
+        offsets, t = [], 0.0
+        for _ in range(n):
+            offsets.append(t)
+            t += rng.expovariate(args.rate)
+        return offsets
+    return [i / args.rate for i in range(n)]
+
+
+async def run_open_loop(args: argparse.Namespace, questions: List[Question]) -> Dict[str, Any]:
+    """응답 속도와 무관하게 예정 시각마다 요청을 발사"""
+    offsets = arrival_offsets(args, len(questions) * args.repeat)
+    fixed_sender = generate_sender_id("random", "")
+    results: List[Result] = []
+
+    async with make_client(args.max_connections, args) as client:
+        async def fire(q: Question, intended: float) -> None:
+            sender = generate_sender_id(args.sender_mode, fixed_sender)
+            results.append(
+                await send_one(
+                    client, args.url, q, sender, args.retries, args.retry_delay, intended,
+                    stream=args.stream,
+                )
+            )
+
+        tasks = []
+        start = time.perf_counter()
+        for i, offset in enumerate(offsets):
+            intended = start + offset
+            wait = intended - time.perf_counter()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            tasks.append(asyncio.create_task(fire(questions[i % len(questions)], intended)))
+        send_window_s = time.perf_counter() - start
+        await asyncio.gather(*tasks)
+        wall_s = time.perf_counter() - start
+
+    report = build_report(results, wall_s, hdr=args.hdr)
+    span = offsets[-1] if len(offsets) > 1 else 0.0
+    report["mode"] = "open"
+    report["arrival"] = "trace" if args.trace else args.arrival
+    report["offered_rps"] = (len(offsets) - 1) / span if span > 0 else None
+    report["achieved_send_rps"] = len(offsets) / send_window_s if send_window_s > 0 else None
+    return report
+
+
+# ---------------------------
+# 리포트
+# ---------------------------
+def summarize(values: List[float], hdr: bool = False) -> Dict[str, Any]:
+    hist = HdrHistogram()
+    for v in values:
+        hist.record(v)
+    out: Dict[str, Any] = hist.summary()
+    if hdr:
+        out["distribution"] = hist.percentile_distribution()
+    return out
+
+
+def build_report(results: List[Result], wall_s: float, hdr: bool = False) -> Dict[str, Any]:
+    verdicts = {"OK": 0, "NG": 0, "None": 0}
+    for r in results:
+        verdicts[r.verdict] += 1
+    validated = verdicts["OK"] + verdicts["NG"]
+    errors = [r for r in results if r.error]
+    ok_results = [r for r in results if not r.error]
+    with_server = [r for r in ok_results if r.server_elapsed_s is not None]
+
+    return {
+        "requests": len(results),
+        "wall_s": wall_s,
+        "throughput_rps": len(results) / wall_s if wall_s > 0 else None,
+        "verdicts": verdicts,
+        "success_rate": verdicts["OK"] / validated if validated else None,
+        "errors": len(errors),
+        "retried": sum(1 for r in results if r.attempts > 1),
+        "client_latency_s": summarize([r.latency_s for r in ok_results], hdr),
+        # 실제 전송 시각부터 잰 지연 (closed 모드에서는 client_latency_s 와 같음)
+        "service_latency_s": summarize([r.service_s for r in ok_results if r.service_s is not None]),
+        "send_lag_s": summarize([r.send_lag_s for r in results]),
+        "time_to_first_message_s": summarize([r.ttfm_s for r in ok_results if r.ttfm_s is not None]),
+        "server_elapsed_s": summarize([r.server_elapsed_s for r in with_server]),
+        # 클라이언트 지연 - 서버 elapsed = 네트워크 + 직렬화 + 큐 대기 등 서버 밖 비용
+        "client_overhead_s": summarize([r.service_s - r.server_elapsed_s for r in with_server]),
+        "sample_errors": sorted({r.error for r in errors})[:5],
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    def ms(v: Optional[float]) -> str:
+        return f"{v * 1000:9.1f}" if v is not None else "        -"
+
+    v = report["verdicts"]
+    rate = report["success_rate"]
+    if report["mode"] == "open":
+        offered = report["offered_rps"] or 0
+        achieved = report["achieved_send_rps"] or 0
+        print(f"mode       : open ({report['arrival']})  offered {offered:.1f} req/s,"
+              f" sent {achieved:.1f} req/s")
+    else:
+        print(f"mode       : closed  concurrency {report['concurrency']}")
+    print(f"requests   : {report['requests']}  (errors {report['errors']}, retried {report['retried']})")
+    print(f"wall time  : {report['wall_s']:.2f}s  throughput {report['throughput_rps'] or 0:.1f} req/s")
+    rate_str = f"  success {rate * 100:.1f}%" if rate is not None else ""
+    print(f"verdicts   : OK {v['OK']}  NG {v['NG']}  None {v['None']}{rate_str}")
+    print(f"{'latency (ms)':<18}{'p50':>9}{'p95':>9}{'p99':>9}{'p99.9':>9}{'max':>9}")
+    rows = [("client_latency_s", "client")]
+    if report["mode"] == "open":
+        rows += [("service_latency_s", "client (sent)"), ("send_lag_s", "send lag")]
+    if report["time_to_first_message_s"]["count"]:
+        rows.append(("time_to_first_message_s", "first message"))
+    rows += [("server_elapsed_s", "server elapsed"), ("client_overhead_s", "client - server")]
+    for key, label in rows:
+        s = report[key]
+        print(f"{label:<18}{ms(s['p50'])}{ms(s['p95'])}{ms(s['p99'])}{ms(s['p999'])}{ms(s['max'])}")
+    for row in report["client_latency_s"].get("distribution", []):
+        pct = row["percentile"]
+        inv = 1.0 / (1.0 - pct / 100.0) if pct < 100.0 else float("inf")
+        print(f"  {ms(row['value_s'])} ms  {pct:10.5f}%  1/(1-q)={inv:.1f}")
+    for err in report["sample_errors"]:
+        print(f"  ! {err}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Mock MyIO webhook load generator")
+    parser.add_argument("input", help="질문 파일 (한 줄에 하나, '--의도' 정답 표기), '-' 이면 stdin")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("-c", "--concurrency", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=1, help="입력 전체를 몇 번 반복할지")
+    parser.add_argument("--timeout", type=float, default=30.0, help="읽기 타임아웃 (초)")
+    parser.add_argument("--connect-timeout", type=float, default=5.0)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--retry-delay", type=float, default=1.0, help="재시도 간격 (초)")
+    parser.add_argument("--sender-mode", choices=("random", "fixed"), default="random")
+    parser.add_argument("--json", action="store_true", help="리포트를 JSON으로 출력")
+    parser.add_argument("--hdr", action="store_true", help="클라이언트 지연 분위수 분포 전체 출력")
+    parser.add_argument("--stream", action="store_true",
+                        help="스트리밍 웹훅(<url>/stream) 사용, 첫 메시지까지 시간(TTFM) 측정")
+
+    open_loop = parser.add_argument_group("open loop")
+    open_loop.add_argument("--rate", type=float, help="목표 도착률 (req/s). 지정하면 오픈 루프 모드")
+    open_loop.add_argument("--arrival", choices=("constant", "poisson"), default="constant")
+    open_loop.add_argument("--trace", help="요청 시각 기록 파일 (한 줄에 타임스탬프 하나, 초)")
+    open_loop.add_argument("--trace-speed", type=float, default=1.0, help="trace 재생 배속")
+    open_loop.add_argument("--max-connections", type=int, default=1000)
+    open_loop.add_argument("--seed", type=int, help="poisson 도착 간격 시드")
+    args = parser.parse_args(argv)
+    if args.rate is not None and args.rate <= 0:
+        parser.error("--rate must be positive")
+
+    if args.input == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(args.input, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    questions = load_questions(lines)
+    if not questions:
+        parser.error("no questions in input")
+
+    if args.rate or args.trace:
+        report = asyncio.run(run_open_loop(args, questions))
+    else:
+        report = asyncio.run(run_closed_loop(args, questions))
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+# metrics.py
+"""
+프로세스 내 경량 메트릭 (Prometheus text format 출력)
+
+모든 값은 레지스트리 하나의 평평한 int64 배열(array('q'))에 들어 있다.
+- 갱신 경로: 배열 원소 하나에 += (락 없음; asyncio 단일 스레드라 원자적)
+- 히스토그램: 버킷 위치는 bisect, 합계는 scale 을 곱한 정수로 저장
+- 렌더링 시에만 누적 버킷/실수 변환을 한다
+
+저장소가 배열 하나라서, 나중에 공유 메모리 같은 다른 버퍼로 바꿔 끼우기 쉽다.
+"""
+import bisect
+import zlib
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def _fmt(v: float) -> str:
+    if v == int(v):
+        return str(int(v))
+    return repr(v)
+
+
+def _labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    inner = ",".join(
+        '{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in pairs
+    )
+    return "{" + inner + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help: str, size: int):
+        self._reg = registry
+        self.name = name
+        self.help = help
+        self._off = registry._alloc(size)
+
+    def render(self, values: Sequence[int]) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, registry, name, help):
+        super().__init__(registry, name, help, 1)
+
+    def inc(self, n: int = 1) -> None:
+        self._reg.values[self._off] += n
+
+    def render(self, values):
+        return [f"{self.name} {values[self._off]}"]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, registry, name, help):
+        super().__init__(registry, name, help, 1)
+
+    def inc(self, n: int = 1) -> None:
+        self._reg.values[self._off] += n
+
+    def dec(self, n: int = 1) -> None:
+        self._reg.values[self._off] -= n
+
+    def set(self, v: int) -> None:
+        self._reg.values[self._off] = v
+
+    def render(self, values):
+        return [f"{self.name} {values[self._off]}"]
+
+
+class LabeledCounter(_Metric):
+    """
+    라벨 값이 미리 정해진 카운터. 모르는 값은 "other" 로 모은다.
+    spare > 0 이면 칸을 spare 개 더 잡아 두고, 실행 중에 add_labels 로 값을 추가할 수 있다
+    (설정 리로드로 생긴 의도 등). 추가한 값은 이름의 crc32 로 spare 칸에 배정 → 배열 크기가 안 바뀌고,
+    워커마다 따로 추가해도 같은 이름은 같은 칸 (공유 메모리 합산이 맞음).
+    두 이름이 같은 칸이면 그 칸은 "a|b" 라벨로 합쳐서 보임.
+    """
+
+    kind = "counter"
+
+    def __init__(self, registry, name, help, label: str, values: Sequence[str], spare: int = 0):
+        self.label = label
+        self.label_values = list(dict.fromkeys(values)) + ["other"]
+        self.spare = spare
+        super().__init__(registry, name, help, len(self.label_values) + spare)
+        self._index: Dict[str, int] = {v: self._off + i for i, v in enumerate(self.label_values)}
+        self._other = self._index["other"]
+        self._spare_off = self._off + len(self.label_values)
+        self._spare_names: Dict[int, List[str]] = {}  # spare 칸 → 그 칸에 배정된 이름들
+
+    def add_labels(self, label_values: Sequence[str]) -> None:
+        if not self.spare:
+            return
+        for v in label_values:
+            if v in self._index:
+                continue
+            off = self._spare_off + zlib.crc32(v.encode("utf-8")) % self.spare
+            self._index[v] = off
+            self._spare_names.setdefault(off, []).append(v)
+
+    def inc(self, label_value: str, n: int = 1) -> None:
+        self._reg.values[self._index.get(label_value, self._other)] += n
+
+    def _rows(self, values: Sequence[int]) -> List[Tuple[str, int]]:
+        rows = [(v, values[self._off + i]) for i, v in enumerate(self.label_values)]
+        for off in range(self._spare_off, self._spare_off + self.spare):
+            names = self._spare_names.get(off)
+            if names:
+                rows.append(("|".join(sorted(names)), values[off]))
+            elif values[off]:
+                # 다른 워커만 아는 이름 (이 워커는 그 설정을 못 봄)
+                rows.append((f"unnamed_{off - self._spare_off}", values[off]))
+        return rows
+
+    def as_dict(self, values: Sequence[int]) -> Dict[str, int]:
+        return dict(self._rows(values))
+
+    def render(self, values):
+        return [f"{self.name}{_labels([(self.label, v)])} {n}" for v, n in self._rows(values)]
+
+
+class Histogram(_Metric):
+    """
+    레이아웃: [버킷 0..n-1, +Inf 버킷, 합계*scale]
+    count 는 버킷 합으로 렌더링 시 계산.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, registry, name, help, buckets: Sequence[float], scale: int = 1_000_000):
+        self.bounds = list(buckets)
+        self.scale = scale
+        super().__init__(registry, name, help, len(self.bounds) + 2)
+        self._sum_off = self._off + len(self.bounds) + 1
+
+    def observe(self, v: float) -> None:
+        values = self._reg.values
+        values[self._off + bisect.bisect_left(self.bounds, v)] += 1
+        values[self._sum_off] += int(v * self.scale)
+
+    def render(self, values):
+        lines = []
+        cum = 0
+        for i, b in enumerate(self.bounds):
+            cum += values[self._off + i]
+            lines.append(f'{self.name}_bucket{{le="{_fmt(b)}"}} {cum}')
+        cum += values[self._off + len(self.bounds)]
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {cum}')
+        lines.append(f"{self.name}_sum {_fmt(values[self._sum_off] / self.scale)}")
+        lines.append(f"{self.name}_count {cum}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.values = array("q")
+        self._metrics: List[_Metric] = []
+
+    def _alloc(self, size: int) -> int:
+        off = len(self.values)
+        self.values.extend([0] * size)
+        return off
+
+    def _add(self, metric: _Metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._add(Counter(self, name, help))
+
+    def gauge(self, name: str, help: str) -> Gauge:
+        return self._add(Gauge(self, name, help))
+
+    def labeled_counter(
+        self, name: str, help: str, label: str, values: Sequence[str], spare: int = 0
+    ) -> LabeledCounter:
+        return self._add(LabeledCounter(self, name, help, label, values, spare))
+
+    def histogram(
+        self, name: str, help: str, buckets: Sequence[float], scale: int = 1_000_000
+    ) -> Histogram:
+        return self._add(Histogram(self, name, help, buckets, scale))
+
+    def gauge_offsets(self) -> List[int]:
+        return [m._off for m in self._metrics if isinstance(m, Gauge)]
+
+    def snapshot(self) -> Sequence[int]:
+        return self.values
+
+    def value(self, metric: _Metric, values: Optional[Sequence[int]] = None) -> int:
+        """단일 값 메트릭(Counter/Gauge)의 현재 값"""
+        if values is None:
+            values = self.snapshot()
+        return values[metric._off]
+
+    def render(self, values: Optional[Sequence[int]] = None) -> str:
+        if values is None:
+            values = self.snapshot()
+        lines: List[str] = []
+        for m in self._metrics:
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            lines.extend(m.render(values))
+        return "\n".join(lines) + "\n"
@@ -1,14 +1,32 @@
 # mock_server.py
 import asyncio
+import json
+import os
 import random
 import time
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
-import uvicorn
+
+import fastjson
+import launcher
+from admission import AdmissionController, Shed
+from filler import SizePolicy, install_compression
+from faults import KINDS as FAULT_KINDS, FaultInjector, install_faults
+from instrumentation import install_instrumentation
+from intent_config import IntentConfig, IntentConfigWatcher
+from latency import LatencyPolicy, parse_model
+from replay_store import RecordLog, ReplayStore
+from sender_locks import SenderLocks
+from sessions import SessionStore
+from traces import PERTURBED as TRACE_PERTURBED, REPLAYED as TRACE_REPLAYED, TraceRing
+from metrics import LATENCY_BUCKETS, SIZE_BUCKETS, MetricsRegistry
+from shared_metrics import SharedSegment, attach_from_env
 
 import random
 import string
@@ -18,6 +36,8 @@ import string
 # ---------------------------
 PORT = 30916
 PATH = "/webhooks/myio/webhook"
+BATCH_PATH = PATH + "/batch"  # 여러 payload를 한 번에 받아 NDJSON으로 흘려보냄
+STREAM_PATH = PATH + "/stream"  # 봇 메시지를 하나씩 SSE / NDJSON 조각으로 흘려보냄
 
 # 간단한 휴리스틱: 메시지 키워드 → 의도 매핑
 INTENT_KEYWORDS = [
@@ -34,11 +54,99 @@ DEFAULT_INTENT = "faq_general"
 # 아래 확률로 "의도 뒤틀기" 옵션 (0.0~1.0)
 INTENT_PERTURB_PROB = 0.15  # 15% 정도는 다른 의도로 응답해보자
 
+# 재현 가능한 실행: MOCK_SEED를 주면 지연/의도 뒤틀기/문장 선택이 모두 같은 순서로 나옴
+# (동시 요청이 있으면 도착 순서에 따라 난수 소비 순서가 달라질 수 있음)
+SEED = os.getenv("MOCK_SEED")
+RNG = random.Random(int(SEED) if SEED is not None else None)
+
+# 지연 모델: MOCK_LATENCY / MOCK_LATENCY_INTENTS (latency.py 참고)
+LATENCY = LatencyPolicy.from_env(RNG)
+# 스트리밍 모드의 메시지 간 간격 (같은 스펙 문법, 예: "fixed:0.2", "lognormal:0.15,0.5")
+STREAM_GAP = parse_model(os.getenv("MOCK_STREAM_GAP", "uniform:0.05,0.3"))
+
+# 응답 크기 모델: MOCK_RESPONSE_SIZE / MOCK_RESPONSE_SIZE_INTENTS (filler.py 참고)
+# 설정하면 echo.answer 에 그 크기만큼 채움 문자열 (시작 시 만든 버퍼에서 잘라 씀)
+SIZES = SizePolicy.from_env(RNG)
+
+# 장애 주입 프로필: MOCK_FAULTS / MOCK_FAULTS_FILE (faults.py 참고), 실행 중에는 PUT /debug/faults
+# 응답용 RNG 와 따로 (장애를 켜도 MOCK_SEED 로 재현되는 응답이 그대로), 시드가 있으면 거기서 파생
+FAULTS = FaultInjector.from_env(random.Random(f"faults:{SEED}") if SEED is not None else None)
+
+# 기록/재생 (replay_store.py 참고)
+#   MOCK_MODE=live    : 매번 랜덤 생성 (기본)
+#   MOCK_MODE=record  : 생성한 (payload, 응답, 지연)을 MOCK_REPLAY_LOG 에 append
+#   MOCK_MODE=replay  : 정규화된 메시지가 같으면 기록된 응답을 그대로 돌려줌 (없으면 live)
+MOCK_MODE = os.getenv("MOCK_MODE", "live")
+REPLAY_LOG_PATH = os.getenv("MOCK_REPLAY_LOG", "mock_replay.log")
+REPLAY_CACHE_SIZE = int(os.getenv("MOCK_REPLAY_CACHE", "10000"))
+REPLAY_TTL_S = float(os.getenv("MOCK_REPLAY_TTL", "0"))  # 0 이면 TTL 없음 (LRU만)
+REPLAY_SLEEP = os.getenv("MOCK_REPLAY_SLEEP", "1") != "0"  # 0 이면 기록된 지연도 건너뜀
+
+# sender 별 대화 상태 (sessions.py 참고): current_flow/previous_flow/turn_count 를 flows 에 반영
+# 켜면 flows 모양이 바뀌므로 기본은 끔 (MOCK_SESSIONS=1 로 켬)
+SESSIONS_ENABLED = os.getenv("MOCK_SESSIONS", "0") != "0"
+SESSION_MAX = int(os.getenv("MOCK_SESSION_MAX", "100000"))
+SESSION_TTL_S = float(os.getenv("MOCK_SESSION_TTL", "1800"))
+
+# 최근 요청 트레이스 (traces.py 참고, /debug/traces). 0 이면 끔
+TRACE_CAPACITY = int(os.getenv("MOCK_TRACES", "10000"))
+
+# sender 별 직렬 처리 (sender_locks.py 참고): 같은 sender 메시지는 도착 순서대로 하나씩
+SENDER_SERIAL = os.getenv("MOCK_SENDER_SERIAL", "0") != "0"
+SENDER_LOCK_SHARDS = int(os.getenv("MOCK_SENDER_LOCK_SHARDS", "64"))
+SENDER_LOCK_TTL_S = float(os.getenv("MOCK_SENDER_LOCK_TTL", "60"))
+SENDER_LOCK_MAX = int(os.getenv("MOCK_SENDER_LOCK_MAX", "2000"))  # shard 당
+
+# 입장 제어 (admission.py 참고): 포화된 백엔드 흉내
+#   MOCK_MAX_IN_FLIGHT : 워커당 동시 처리 상한 (0 이면 제한 없음)
+#   MOCK_MAX_QUEUE     : 상한에 걸렸을 때 기다릴 수 있는 요청 수 (넘치면 503)
+#   MOCK_QUEUE_TIMEOUT : 대기열에서 기다리는 최대 시간 (넘으면 503)
+#   MOCK_SENDER_RATE   : sender 별 초당 요청 수 (0 이면 제한 없음, 넘으면 429)
+ADMIT_MAX_IN_FLIGHT = int(os.getenv("MOCK_MAX_IN_FLIGHT", "0"))
+ADMIT_MAX_QUEUE = int(os.getenv("MOCK_MAX_QUEUE", "100"))
+ADMIT_QUEUE_TIMEOUT_S = float(os.getenv("MOCK_QUEUE_TIMEOUT", "1.0"))
+ADMIT_RETRY_AFTER_S = float(os.getenv("MOCK_RETRY_AFTER", "1"))
+ADMIT_SENDER_RATE = float(os.getenv("MOCK_SENDER_RATE", "0"))
+ADMIT_SENDER_BURST = float(os.getenv("MOCK_SENDER_BURST", "5"))
+
+# 의도 설정 핫 리로드 (intent_config.py 참고): 아래 의도/문장 상수 대신 JSON 파일을 쓰고 바뀌면 재시작 없이 교체
+INTENT_CONFIG_PATH = os.getenv("MOCK_INTENT_CONFIG") or None
+INTENT_CONFIG_POLL_S = float(os.getenv("MOCK_INTENT_CONFIG_POLL", "1.0"))
+# 리로드로 새로 생길 수 있는 의도 라벨 칸 수 (mock_intent_total, 워커 공유 메모리 크기가 고정이라 미리 잡아 둠)
+INTENT_LABEL_SLOTS = int(os.getenv("MOCK_INTENT_LABEL_SLOTS", "64"))
+
+# 의도 판정 엔진: keyword (IntentMatcher) | ngram (ngram_intent.py, numpy 필요 — 배치 단위로 한 번에 채점)
+INTENT_ENGINE = os.getenv("MOCK_INTENT_ENGINE", "keyword").lower()
+INTENT_TRAIN_PATH = os.getenv("MOCK_INTENT_TRAIN") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "intent_train.example.txt"
+)
+
+# JSON 빠른 경로 (fastjson.py 참고): msgspec 디코딩 + orjson 인코딩, 응답 바이트는 기본 경로와 같음
+FAST_JSON = os.getenv("MOCK_FAST_JSON", "0") != "0"
+
+# 런처 부모 프로세스 / spawn 재임포트(__mp_main__)가 아닌 실제 서버 프로세스인지
+IS_WORKER = __name__ not in ("__main__", "__mp_main__")
+
 
 # ---------------------------
 # FastAPI App
 # ---------------------------
-app = FastAPI(title="Mock MyIO Webhook", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    CONFIG.start()  # 설정 파일 감시 (파일이 없으면 아무것도 안 함)
+    try:
+        yield
+    finally:
+        CONFIG.stop()
+
+
+app = FastAPI(title="Mock MyIO Webhook", version="1.0.0", lifespan=lifespan)
+
+# 웹훅 경로(단건/스트림/배치)에만 장애 주입. CORS 보다 안쪽이라 5xx 에도 CORS 헤더가 붙음
+install_faults(app, FAULTS, [PATH])
+
+# 큰 응답 압축 (MOCK_COMPRESS=gzip|br|auto, 기본 off)
+COMPRESS = install_compression(app)
 
 # CORS: 프론트가 file://, 다른 도메인에서도 부를 수 있게 허용
 app.add_middleware(
@@ -49,6 +157,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 구간별 시간 측정 (/debug/timings, /debug/profile). CORS 까지 포함하도록 가장 바깥에
+INSTR = install_instrumentation(app)
+
 
 class WebhookPayload(BaseModel):
     sender: str
@@ -56,23 +167,281 @@ class WebhookPayload(BaseModel):
     metadata: Optional[Dict[str, Any]] = None
 
 
+# 요청 본문 → payload. 빠른 경로면 pydantic 을 거치지 않고 msgspec 으로 바로 디코딩
+# (fastjson.Payload 도 sender/message/metadata 속성이 같아서 아래 코드는 그대로 씀)
+if FAST_JSON:
+    async def read_payload(request: Request) -> fastjson.Payload:
+        try:
+            return fastjson.decode_payload(await request.body())
+        except fastjson.DecodeError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+    async def read_payloads(request: Request) -> List[fastjson.Payload]:
+        try:
+            return fastjson.decode_payloads(await request.body())
+        except fastjson.DecodeError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+    def json_response(resp: Dict[str, Any]) -> Response:
+        return Response(fastjson.dumps(resp), media_type="application/json")
+
+    def encode_json(obj: Any) -> bytes:
+        return fastjson.dumps(obj)
+else:
+    async def read_payload(payload: WebhookPayload) -> WebhookPayload:
+        return payload
+
+    async def read_payloads(payloads: List[WebhookPayload]) -> List[WebhookPayload]:
+        return payloads
+
+    def json_response(resp: Dict[str, Any]) -> Response:
+        return JSONResponse(resp)
+
+    def encode_json(obj: Any) -> bytes:
+        # JSONResponse 와 같은 인코딩 (MOCK_FAST_JSON 을 켜도 스트림/배치 줄 바이트가 그대로)
+        return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+# 키워드 테이블은 설정 버전마다 한 번만 컴파일 (메시지당 한 번의 스캔으로 전체 히트 탐색, CONFIG 참고)
 def pick_intent_by_keywords(message: str) -> str:
-    msg_lower = message.lower()
-    for intent, keys in INTENT_KEYWORDS:
-        if any(k.lower() in msg_lower for k in keys):
-            return intent
-    return DEFAULT_INTENT
+    return CONFIG.current.matcher.pick(message)
+
+
+# ngram 엔진은 시작 시 학습 파일로 한 번 학습 (의도 목록도 학습 파일 기준, 설정 핫 리로드와는 별개)
+if INTENT_ENGINE == "ngram":
+    from ngram_intent import NgramIntentClassifier
+
+    CLASSIFIER: Optional["NgramIntentClassifier"] = NgramIntentClassifier.from_file(INTENT_TRAIN_PATH)
+elif INTENT_ENGINE == "keyword":
+    CLASSIFIER = None
+else:
+    raise ValueError(f"MOCK_INTENT_ENGINE must be keyword or ngram, got {INTENT_ENGINE!r}")
+
+
+# ---------------------------
+# Metrics (/metrics, Prometheus text format)
+# ---------------------------
+METRICS = MetricsRegistry()
+M_REQUESTS = METRICS.counter("mock_requests_total", "Webhook items processed")
+M_IN_FLIGHT = METRICS.gauge("mock_requests_in_flight", "Webhook HTTP requests currently in flight")
+M_PERTURBED = METRICS.counter("mock_intent_perturbed_total", "Intents replaced by maybe_perturb_intent")
+# 기본 의도 + ngram 학습 의도는 고정 칸, 설정 리로드로 생긴 의도는 spare 칸 (이름 해시로 배정)
+M_INTENT = METRICS.labeled_counter(
+    "mock_intent_total", "Served intents", "intent",
+    [i for i, _ in INTENT_KEYWORDS] + [DEFAULT_INTENT] + (CLASSIFIER.intents if CLASSIFIER else []),
+    spare=INTENT_LABEL_SLOTS,
+)
+M_LATENCY = METRICS.histogram("mock_request_latency_seconds", "Server-side elapsed per item", LATENCY_BUCKETS)
+M_DELAY = METRICS.histogram("mock_simulated_delay_seconds", "Simulated delay per item", LATENCY_BUCKETS)
+M_REQ_SIZE = METRICS.histogram("mock_request_size_bytes", "HTTP request body size", SIZE_BUCKETS, scale=1)
+M_RESP_SIZE = METRICS.histogram("mock_response_size_bytes", "HTTP response body size", SIZE_BUCKETS, scale=1)
+
+M_REPLAY_HITS = METRICS.counter("mock_replay_hits_total", "Responses served from the replay log")
+M_REPLAY_MISSES = METRICS.counter("mock_replay_misses_total", "Replay lookups that fell back to live")
+M_RECORDED = METRICS.counter("mock_recorded_total", "Responses appended to the record log")
+M_SESSIONS = METRICS.gauge("mock_sessions", "Live per-sender sessions")
+M_SENDER_WAIT = METRICS.histogram(
+    "mock_sender_lock_wait_seconds", "Time spent waiting for the per-sender lock", LATENCY_BUCKETS
+)
+M_SESSION_EVICTIONS = METRICS.labeled_counter(
+    "mock_session_evictions_total", "Sessions evicted", "reason", ["ttl", "size"]
+)
+M_QUEUE_DEPTH = METRICS.gauge("mock_admission_queue_depth", "Requests waiting for an admission slot")
+M_QUEUE_WAIT = METRICS.histogram(
+    "mock_admission_queue_wait_seconds", "Time admitted requests spent queued", LATENCY_BUCKETS
+)
+M_SHED = METRICS.labeled_counter(
+    "mock_shed_total", "Requests rejected by admission control", "reason",
+    ["rate_limited", "queue_full", "queue_timeout"],
+)
+M_FAULTS = METRICS.labeled_counter(
+    "mock_faults_injected_total", "Faults injected by the active fault profile", "fault", list(FAULT_KINDS)
+)
+FAULTS.on_inject = M_FAULTS.inc
+
+# 런처로 띄운 경우 워커 간 공유 메모리에 연결 → /health, /metrics 는 전체 서버 합계
+# (spawn 된 워커가 이 스크립트를 __mp_main__ 으로 한 번 더 읽을 때는 연결하지 않음)
+SHARED_METRICS = attach_from_env(METRICS) if IS_WORKER else None
+
+RECORDER = RecordLog(REPLAY_LOG_PATH) if IS_WORKER and MOCK_MODE == "record" else None
+REPLAY = (
+    ReplayStore(REPLAY_LOG_PATH, REPLAY_CACHE_SIZE, REPLAY_TTL_S)
+    if IS_WORKER and MOCK_MODE == "replay" else None
+)
+SENDER_LOCKS = (
+    SenderLocks(SENDER_LOCK_SHARDS, SENDER_LOCK_TTL_S, SENDER_LOCK_MAX)
+    if SENDER_SERIAL else None
+)
+TRACES = TraceRing(TRACE_CAPACITY) if TRACE_CAPACITY > 0 else None
+SESSIONS = (
+    SessionStore(SESSION_MAX, SESSION_TTL_S, on_evict=M_SESSION_EVICTIONS.inc)
+    if SESSIONS_ENABLED else None
+)
+ADMISSION = AdmissionController(
+    ADMIT_MAX_IN_FLIGHT,
+    ADMIT_MAX_QUEUE,
+    ADMIT_QUEUE_TIMEOUT_S,
+    ADMIT_RETRY_AFTER_S,
+    ADMIT_SENDER_RATE,
+    ADMIT_SENDER_BURST,
+    on_shed=M_SHED.inc,
+    on_wait=M_QUEUE_WAIT.observe,
+)
 
 
-def maybe_perturb_intent(intent: str) -> str:
-    if random.random() < INTENT_PERTURB_PROB:
+def maybe_perturb_intent(intent: str, cfg: IntentConfig) -> str:
+    if RNG.random() < cfg.perturb_prob:
         # 의도 리스트에서 다른 걸 하나 랜덤으로 고름
-        pool = [i for i, _ in INTENT_KEYWORDS] + [DEFAULT_INTENT]
-        pool = [i for i in pool if i != intent]
-        return random.choice(pool)
+        pool = cfg.perturb_pool(intent)
+        return RNG.choice(pool) if pool else intent
     return intent
 
 
+def classify(messages: List[str], cfg: IntentConfig) -> List[Tuple[str, List[str], Optional[float]]]:
+    """
+    뒤틀기 전 판정. (의도, 키워드가 걸린 의도 전체, 확신도)
+    ngram 엔진은 메시지 전체를 한 번에 채점하고, 키워드 매칭은 비교용으로 echo 에만 남긴다.
+    keyword 엔진은 확신도 None.
+    """
+    matches = [cfg.matcher.pick_with_matches(m) for m in messages]
+    if CLASSIFIER is None:
+        return [(picked, matched, None) for picked, matched in matches]
+    return [
+        (intent, matched, conf)
+        for (intent, conf), (_, matched) in zip(CLASSIFIER.predict(messages), matches)
+    ]
+
+
+def decide_intents(messages: List[str], cfg: IntentConfig) -> List[Tuple[str, List[str], bool, Optional[float]]]:
+    """판정 + 의도 뒤틀기. 메시지마다 (의도, 매칭된 의도 전체, 뒤틀렸는지, 확신도)"""
+    decided = []
+    for picked, matched_intents, confidence in classify(messages, cfg):
+        intent = maybe_perturb_intent(picked, cfg)
+        perturbed = intent != picked
+        if perturbed:
+            M_PERTURBED.inc()
+        M_INTENT.inc(intent)
+        decided.append((intent, matched_intents, perturbed, confidence))
+    return decided
+
+
+def decide_intent(message: str, cfg: IntentConfig) -> Tuple[str, List[str], bool, Optional[float]]:
+    return decide_intents([message], cfg)[0]
+
+
+def server_counters() -> Dict[str, Any]:
+    values = METRICS.snapshot()
+    return {
+        "workers": SHARED_METRICS.live_workers() if SHARED_METRICS else 1,
+        "requests_served": METRICS.value(M_REQUESTS, values),
+        "in_flight": METRICS.value(M_IN_FLIGHT, values),
+        "perturbed": METRICS.value(M_PERTURBED, values),
+        "queue_depth": METRICS.value(M_QUEUE_DEPTH, values),
+        "shed": M_SHED.as_dict(values),
+        "faults": M_FAULTS.as_dict(values),
+    }
+
+
+async def admit(sender: Optional[str]) -> None:
+    """입장 슬롯 확보 (대기 중에는 queue depth 게이지 반영). 실패하면 Shed"""
+    if not ADMISSION.enabled:
+        return
+    M_QUEUE_DEPTH.inc()
+    try:
+        await ADMISSION.acquire(sender)
+    finally:
+        M_QUEUE_DEPTH.dec()
+
+
+def release() -> None:
+    if ADMISSION.enabled:
+        ADMISSION.release()
+
+
+class AdmittedStream(StreamingResponse):
+    """admit() 로 잡은 슬롯을 응답이 끝날 때 반납하는 StreamingResponse.
+    본문 제너레이터의 finally 에 맡기면, 제너레이터가 시작도 하기 전에 클라이언트가 끊거나
+    전송이 실패했을 때 슬롯이 영영 안 돌아옴 → ASGI 호출 자체를 감싸서 반납
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            M_IN_FLIGHT.dec()
+            release()
+
+
+def admitted_stream(body: AsyncIterator[bytes], **kwargs) -> StreamingResponse:
+    """admit() 뒤에 부름. 응답을 만들다 실패해도 슬롯 반납"""
+    M_IN_FLIGHT.inc()
+    try:
+        return AdmittedStream(body, **kwargs)
+    except BaseException:
+        M_IN_FLIGHT.dec()
+        release()
+        raise
+
+
+@app.exception_handler(Shed)
+async def on_shed(request: Request, exc: Shed):
+    return JSONResponse(
+        {"detail": "overloaded" if exc.status == 503 else "rate limited", "reason": exc.reason},
+        status_code=exc.status,
+        headers={"Retry-After": exc.retry_after_header},
+    )
+
+
+@app.get("/debug/sender_locks")
+async def debug_sender_locks(sender: Optional[str] = None, top: int = 10):
+    if SENDER_LOCKS is None:
+        return {"enabled": False}
+    out: Dict[str, Any] = {"enabled": True, **SENDER_LOCKS.stats(), "top_waiting": SENDER_LOCKS.top_waiting(top)}
+    if sender is not None:
+        entry = SENDER_LOCKS.get(sender)
+        out["sender"] = entry.to_dict() if entry else None
+    return out
+
+
+@app.get("/debug/traces")
+async def debug_traces(
+    sender: Optional[str] = None,
+    intent: Optional[str] = None,
+    route: Optional[str] = None,
+    min_ms: float = 0.0,
+    perturbed: Optional[bool] = None,
+    before: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=1000),
+):
+    """최근 트레이스 (최신부터). 다음 페이지는 next_before 를 before 로"""
+    if TRACES is None:
+        return {"enabled": False}
+    traces, next_before = TRACES.query(sender, intent, route, min_ms, perturbed, before, limit)
+    return {
+        "enabled": True,
+        "worker": os.getpid(),
+        **TRACES.stats(),
+        "traces": traces,
+        "next_before": next_before,
+    }
+
+
+@app.get("/debug/sessions")
+async def debug_sessions(sender: Optional[str] = None):
+    if SESSIONS is None:
+        return {"enabled": False}
+    out: Dict[str, Any] = {"enabled": True, **SESSIONS.stats()}
+    if sender is not None:
+        sess = SESSIONS.get(sender)
+        out["session"] = sess.to_dict() if sess else None
+    return out
+
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 async def root():
     return {
@@ -91,6 +460,21 @@ async def root():
         "path": PATH,
         "port": PORT,
         "hint": "POST a JSON to /webhooks/myio/webhook with {sender, message, metadata}",
+        "latency": LATENCY.describe(),
+        "seed": SEED,
+        "mode": MOCK_MODE,
+        "replay": REPLAY.stats() if REPLAY else None,
+        "sender_locks": SENDER_LOCKS.stats() if SENDER_LOCKS else None,
+        "traces": TRACES.stats() if TRACES else None,
+        "intent_config": CONFIG.stats(),
+        "intent_engine": CLASSIFIER.describe() if CLASSIFIER else "keyword",
+        "admission": ADMISSION.stats(),
+        "faults": FAULTS.profile.describe(),
+        "response_size": SIZES.describe(),
+        "compress": COMPRESS,
+        "loop": INSTR.loop_lag.snapshot(),
+        "json": fastjson.backend() if FAST_JSON else "default",
+        "counters": server_counters(),
     }
 
 # ---------------------------
@@ -109,53 +493,375 @@ CANDIDATE_MESSAGES = [
     "곧 답변을 드리겠습니다."
 ]
 
+# 위 상수들이 기본값 (MOCK_INTENT_CONFIG 파일에 없는 키도 여기서 채움)
+CONFIG = IntentConfigWatcher(
+    IntentConfig(INTENT_KEYWORDS, DEFAULT_INTENT, INTENT_PERTURB_PROB, CANDIDATE_MESSAGES, "builtin"),
+    INTENT_CONFIG_PATH,
+    INTENT_CONFIG_POLL_S,
+    on_change=lambda cfg: M_INTENT.add_labels(cfg.intents),
+)
 
-@app.post(PATH)
-async def webhook(payload: WebhookPayload, request: Request):
-    recv_at = datetime.now(timezone.utc)
-    t0 = time.perf_counter()
-
-    delay = random.uniform(0.3, 2.0)
-    await asyncio.sleep(delay)
-
-    intent = pick_intent_by_keywords(payload.message or "")
-    intent = maybe_perturb_intent(intent)
 
+def build_response(
+    payload: WebhookPayload,
+    intent: str,
+    matched_intents: List[str],
+    delay: float,
+    recv_at: datetime,
+    t0: float,
+    client_host: Optional[str],
+    cfg: IntentConfig,
+    confidence: Optional[float] = None,
+) -> Dict[str, Any]:
     # messages: 3~4개의 의미 있는 랜덤 문장
-    n_msgs = random.randint(3, 4)
-    chosen_msgs = random.sample(CANDIDATE_MESSAGES, n_msgs)
+    n_msgs = min(RNG.randint(3, 4), len(cfg.candidate_messages))
+    chosen_msgs = RNG.sample(cfg.candidate_messages, n_msgs)
     messages = [{"recipient_id": payload.sender, "text": msg} for msg in chosen_msgs]
 
+    flows = [{"set_slot": f"current_flow={intent}"}]
+    if SESSIONS is not None:
+        # 진행 중인 대화처럼: 이전 flow, 턴 수, metadata.slots 로 받은 슬롯 값
+        slots = (payload.metadata or {}).get("slots")
+        sess = SESSIONS.advance(payload.sender, intent, slots if isinstance(slots, dict) else None)
+        M_SESSIONS.set(len(SESSIONS))
+        if sess.prev_flow:
+            flows.append({"set_slot": f"previous_flow={sess.prev_flow}"})
+        flows.append({"set_slot": f"turn_count={sess.turns}"})
+        for name, value in (sess.slots or {}).items():
+            flows.append({"set_slot": f"{name}={value}"})
+    flows.append({"set_slot": f"debug_delay={delay:.2f}s"})
+
     resp: Dict[str, Any] = {
         "messages": messages,
-        "flows": [
-            {"set_slot": f"current_flow={intent}"},
-            {"set_slot": f"debug_delay={delay:.2f}s"},
-        ],
+        "flows": flows,
         "echo": {
             "sender": payload.sender,
             "message": payload.message,
             "received_at": recv_at.isoformat(),
-            "client_host": request.client.host if request.client else None,
+            "client_host": client_host,
+            "matched_intents": matched_intents,
         },
     }
+    if confidence is not None:
+        resp["echo"]["intent_confidence"] = round(confidence, 4)  # ngram 엔진만
+    answer = SIZES.filler(intent)
+    if answer is not None:
+        resp["echo"]["answer"] = answer  # 프론트는 쓰지 않는 필드 (08-23 과 같은 위치)
+    return finish_response(resp, delay, t0, cfg)
+
 
+def finish_response(resp: Dict[str, Any], delay: float, t0: float, cfg: IntentConfig) -> Dict[str, Any]:
     elapsed = time.perf_counter() - t0
     resp["server_metrics"] = {
         "delay_s": round(delay, 3),
         "elapsed_s": round(elapsed, 3),
+        "config_version": cfg.version,
     }
 
+    M_REQUESTS.inc()
+    M_DELAY.observe(delay)
+    M_LATENCY.observe(elapsed)
     return resp
 
 
+def lookup_replay(payload: WebhookPayload) -> Optional[Dict[str, Any]]:
+    if REPLAY is None:
+        return None
+    record = REPLAY.get(payload.message or "")
+    (M_REPLAY_HITS if record is not None else M_REPLAY_MISSES).inc()
+    return record
+
+
+def replay_delay(record: Dict[str, Any]) -> float:
+    return float(record.get("d", 0.0)) if REPLAY_SLEEP else 0.0
+
+
+def build_replayed_response(
+    record: Dict[str, Any],
+    payload: WebhookPayload,
+    delay: float,
+    recv_at: datetime,
+    t0: float,
+    client_host: Optional[str],
+    cfg: IntentConfig,
+) -> Dict[str, Any]:
+    # 기록된 messages/flows 는 그대로, 요청마다 달라지는 값만 새로 채움
+    stored = record["r"]
+    resp: Dict[str, Any] = {
+        "messages": [dict(m, recipient_id=payload.sender) for m in stored.get("messages", [])],
+        "flows": stored.get("flows", []),
+        "echo": dict(
+            stored.get("echo", {}),
+            sender=payload.sender,
+            message=payload.message,
+            received_at=recv_at.isoformat(),
+            client_host=client_host,
+            replayed=True,
+        ),
+    }
+    return finish_response(resp, delay, t0, cfg)
+
+
+def record_response(payload: WebhookPayload, resp: Dict[str, Any], delay: float) -> None:
+    if RECORDER is None:
+        return
+    RECORDER.append(
+        {"sender": payload.sender, "message": payload.message, "metadata": payload.metadata},
+        resp,
+        delay,
+    )
+    M_RECORDED.inc()
+
+
+@asynccontextmanager
+async def sender_turn(sender: str):
+    """직렬 모드면 이 sender 차례가 올 때까지 기다림. 기다린 초를 넘겨줌"""
+    if SENDER_LOCKS is None:
+        yield 0.0
+        return
+    entry, wait = await SENDER_LOCKS.acquire(sender)
+    M_SENDER_WAIT.observe(wait)
+    try:
+        yield wait
+    finally:
+        SENDER_LOCKS.release(entry)
+
+
+def note_sender_wait(resp: Dict[str, Any], wait: float) -> Dict[str, Any]:
+    if SENDER_LOCKS is not None:
+        resp["server_metrics"]["sender_wait_s"] = round(wait, 3)
+    return resp
+
+
+def flow_intent(resp: Dict[str, Any]) -> str:
+    """flows 의 current_flow 값 (재생 응답은 기록된 의도를 여기서 꺼냄)"""
+    for flow in resp.get("flows", ()):
+        name, _, value = flow.get("set_slot", "").partition("=")
+        if name == "current_flow":
+            return value
+    return ""
+
+
+def trace(
+    route: str,
+    payload: WebhookPayload,
+    resp: Dict[str, Any],
+    perturbed: bool,
+    t0: float,
+    req_bytes: int,
+    resp_bytes: int,
+) -> None:
+    if TRACES is None:
+        return
+    replayed = resp["echo"].get("replayed", False)
+    flags = (TRACE_PERTURBED if perturbed else 0) | (TRACE_REPLAYED if replayed else 0)
+    TRACES.record(
+        route,
+        payload.sender,
+        payload.message,
+        flow_intent(resp),
+        flags,
+        resp["server_metrics"]["delay_s"],
+        time.perf_counter() - t0,
+        req_bytes,
+        resp_bytes,
+    )
+
+
+async def produce_response(
+    payload: WebhookPayload, recv_at: datetime, t0: float, client_host: Optional[str]
+) -> Tuple[Dict[str, Any], bool]:
+    """재생(있으면) 또는 live 생성: 지연만큼 기다린 뒤 (응답 dict, 의도가 뒤틀렸는지)"""
+    async with sender_turn(payload.sender) as wait:
+        cfg = CONFIG.current  # 처리 도중 설정이 바뀌어도 이 요청은 이 버전으로 끝까지
+        record = lookup_replay(payload)
+        if record is not None:
+            delay = replay_delay(record)
+            await asyncio.sleep(delay)
+            resp = build_replayed_response(record, payload, delay, recv_at, t0, client_host, cfg)
+            return note_sender_wait(resp, wait), False
+
+        intent, matched_intents, perturbed, confidence = decide_intent(payload.message or "", cfg)
+
+        # 의도별 지연 모델 (예: product_master_data는 greeting보다 느리게)
+        delay = LATENCY.sample(intent)
+        await asyncio.sleep(delay)
+
+        resp = build_response(payload, intent, matched_intents, delay, recv_at, t0, client_host, cfg, confidence)
+        record_response(payload, resp, delay)
+        return note_sender_wait(resp, wait), perturbed
+
+
+@app.post(PATH)
+async def webhook(request: Request, payload: WebhookPayload = Depends(read_payload)):
+    recv_at = datetime.now(timezone.utc)
+    t0 = time.perf_counter()
+    req_bytes = int(request.headers.get("content-length") or 0)
+    M_REQ_SIZE.observe(req_bytes)
+    await admit(payload.sender)
+    M_IN_FLIGHT.inc()
+    try:
+        client_host = request.client.host if request.client else None
+        resp, perturbed = await produce_response(payload, recv_at, t0, client_host)
+        response = json_response(resp)
+        M_RESP_SIZE.observe(len(response.body))
+        trace(PATH, payload, resp, perturbed, t0, req_bytes, len(response.body))
+        return response
+    finally:
+        M_IN_FLIGHT.dec()
+        release()
+
+
+@app.post(STREAM_PATH)
+async def webhook_stream(
+    request: Request,
+    payload: WebhookPayload = Depends(read_payload),
+    format: str = "sse",
+    gap_ms: Optional[float] = None,
+):
+    """
+    점진 전송 모드: 첫 메시지는 지연 모델만큼 기다린 뒤, 이후 메시지는 간격(gap)마다 하나씩.
+    마지막 이벤트(done)에 flows / server_metrics (+ ttfm_s: 첫 메시지까지 걸린 시간)를 싣는다.
+      format=sse    : "event: message|done" Server-Sent Events
+      format=ndjson : {"type": "message"|"done", ...} 한 줄씩 (chunked)
+      gap_ms        : 메시지 간격 고정값 (없으면 MOCK_STREAM_GAP 모델)
+    """
+    recv_at = datetime.now(timezone.utc)
+    t0 = time.perf_counter()
+    client_host = request.client.host if request.client else None
+    req_bytes = int(request.headers.get("content-length") or 0)
+    M_REQ_SIZE.observe(req_bytes)
+    sse = format != "ndjson"
+
+    def encode(kind: str, data: Dict[str, Any]) -> bytes:
+        if sse:
+            return f"event: {kind}\ndata: ".encode("utf-8") + encode_json(data) + b"\n\n"
+        return encode_json({"type": kind, **data}) + b"\n"
+
+    async def stream():
+        sent = 0
+        try:
+            resp, perturbed = await produce_response(payload, recv_at, t0, client_host)
+            ttfm = time.perf_counter() - t0
+            gaps = []
+            for i, msg in enumerate(resp["messages"]):
+                if i:
+                    gap = gap_ms / 1000.0 if gap_ms is not None else max(0.0, STREAM_GAP.sample(RNG))
+                    gaps.append(round(gap, 3))
+                    await asyncio.sleep(gap)
+                chunk = encode("message", dict(msg, index=i))
+                sent += len(chunk)
+                yield chunk
+
+            metrics = resp["server_metrics"]
+            metrics["ttfm_s"] = round(ttfm, 3)
+            metrics["elapsed_s"] = round(time.perf_counter() - t0, 3)
+            metrics["gaps_s"] = gaps
+            chunk = encode("done", {"flows": resp["flows"], "server_metrics": metrics, "echo": resp["echo"]})
+            sent += len(chunk)
+            yield chunk
+            trace(STREAM_PATH, payload, resp, perturbed, t0, req_bytes, sent)
+        finally:
+            M_RESP_SIZE.observe(sent)
+
+    media_type = "text/event-stream" if sse else "application/x-ndjson"
+    # 슬롯은 스트림이 끝날 때까지 잡고 있음 (차단은 첫 바이트 전에 상태 코드로), 반납은 AdmittedStream 이
+    await admit(payload.sender)
+    return admitted_stream(
+        stream(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post(BATCH_PATH)
+async def webhook_batch(request: Request, payloads: List[WebhookPayload] = Depends(read_payloads)):
+    """
+    payload 리스트를 받아 의도 판정은 한꺼번에 끝내고,
+    각 항목의 지연이 끝나는 순서대로 NDJSON 한 줄씩 바로 흘려보낸다.
+    각 줄은 단건 웹훅과 같은 스키마 (+ echo.batch_index 로 입력 순서 표시)
+    항목 하나가 실패하면 그 줄만 {"error": ..., "echo": {"batch_index", "sender"}} 로 (나머지는 계속)
+    """
+    recv_at = datetime.now(timezone.utc)
+    t0 = time.perf_counter()
+    client_host = request.client.host if request.client else None
+    req_bytes = int(request.headers.get("content-length") or 0)
+    M_REQ_SIZE.observe(req_bytes)
+    # 배치 하나가 슬롯 하나 (rate limit 은 첫 항목의 sender 기준)
+    await admit(payloads[0].sender if payloads else None)
+    try:
+        cfg = CONFIG.current  # 배치 전체가 같은 설정 버전
+
+        # 0) 재생 모드면 기록된 응답부터 찾음
+        records = [lookup_replay(p) for p in payloads]
+
+        # 1) 의도 판정: 전체를 한 번에 (ngram 엔진은 행렬 연산 한 번, 뒤틀기까지 끝낸 뒤 의도별 지연 샘플)
+        live = [i for i, rec in enumerate(records) if rec is None]
+        picks: List[Optional[Tuple[str, List[str], bool, Optional[float]]]] = [None] * len(payloads)
+        for i, pick in zip(live, decide_intents([payloads[i].message or "" for i in live], cfg)):
+            picks[i] = pick
+        delays = [
+            LATENCY.sample(pick[0]) if rec is None else replay_delay(rec)
+            for pick, rec in zip(picks, records)
+        ]
+    except BaseException:
+        release()  # 응답을 만들기 전에 실패 → 여기서 반납 (이후는 AdmittedStream 이)
+        raise
+
+    done: "asyncio.Queue[Tuple[int, Dict[str, Any], bool]]" = asyncio.Queue()
+
+    async def run_item(idx: int) -> None:
+        payload, delay = payloads[idx], delays[idx]
+        perturbed = False
+        try:
+            # 같은 sender 항목은 직렬 모드면 입력 순서대로 하나씩
+            async with sender_turn(payload.sender) as wait:
+                await asyncio.sleep(delay)
+                if records[idx] is not None:
+                    resp = build_replayed_response(records[idx], payload, delay, recv_at, t0, client_host, cfg)
+                else:
+                    intent, matched_intents, perturbed, confidence = picks[idx]
+                    resp = build_response(
+                        payload, intent, matched_intents, delay, recv_at, t0, client_host, cfg, confidence
+                    )
+                    record_response(payload, resp, delay)
+            note_sender_wait(resp, wait)
+            resp["echo"]["batch_index"] = idx
+        except Exception as e:
+            # 어떤 경우에도 한 줄은 넣음 (안 넣으면 stream() 이 done.get() 에서 영원히 기다림)
+            resp = {"error": f"{type(e).__name__}: {e}", "echo": {"batch_index": idx, "sender": payload.sender}}
+        done.put_nowait((idx, resp, perturbed))
+
+    async def stream():
+        tasks = [asyncio.create_task(run_item(i)) for i in range(len(payloads))]
+        sent = 0
+        try:
+            # 2) 끝난 순서대로 한 줄씩
+            for _ in range(len(tasks)):
+                idx, resp, perturbed = await done.get()
+                line = encode_json(resp) + b"\n"
+                sent += len(line)
+                # 항목별 트레이스 (요청 크기는 배치 전체 본문). 실패한 항목은 기록할 응답이 없음
+                if "error" not in resp:
+                    trace(BATCH_PATH, payloads[idx], resp, perturbed, t0, req_bytes, len(line))
+                yield line
+        finally:
+            # 클라이언트가 중간에 끊으면 남은 지연 작업 정리
+            for t in tasks:
+                t.cancel()
+            M_RESP_SIZE.observe(sent)
+
+    return admitted_stream(stream(), media_type="application/x-ndjson")
+
+
 if __name__ == "__main__":
-    # uvicorn으로 바로 실행 (포트 30916)
-    uvicorn.run(
+    # python mock_server.py --workers 4   (launcher.py 참고, 기본 포트 30916)
+    def prepare_shared_metrics(workers: int):
+        segment = SharedSegment(len(METRICS.values), max_slots=workers + 8)
+        return segment.close
+
+    launcher.run(
         "mock_server:app",
-        host="0.0.0.0",
-        port=PORT,
-        reload=True,  # 개발 중이면 True로
-        workers=1,
-        log_level="info",
+        launcher.parse_args("Mock MyIO Webhook", PORT),
+        before_start=prepare_shared_metrics,
     )
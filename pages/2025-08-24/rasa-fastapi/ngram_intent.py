@@ -0,0 +1,248 @@
+# ngram_intent.py
+"""
+문자 n-gram 해싱 + 선형 모델(softmax 회귀) 의도 분류기 — 키워드 매칭의 대안 엔진
+
+    MOCK_INTENT_ENGINE=ngram MOCK_INTENT_TRAIN=intent_train.example.txt python mock_server.py
+
+- 학습 파일: 한 줄에 "문장 --intent" (rasa-test-ui 질문 파일 / loadgen 입력과 같은 형식)
+- 특징: 앞뒤 공백을 붙인 소문자 문장의 문자 2~4-gram 을 2^bits 칸으로 해싱 (+ bias 칸 0번)
+  값은 1/sqrt(특징 수) 로 정규화 → 문장 길이에 덜 민감
+- 배치 전체를 한 번에 처리:
+    1) 모든 문장을 이어 붙인 코드포인트 배열에서 n-gram 롤링 해시를 벡터로 계산
+    2) (문장 번호, 특징 번호, 값) 희소 행렬 X 와 가중치 W (2^bits x 의도 수) 의 곱을
+       np.bincount 한 번으로 계산 → softmax
+- 결과: (의도, 확신도 = softmax 최대값)
+
+벤치마크 (배치 크기 1 / 64 / 4096, 키워드 매처와 비교):
+    python ngram_intent.py intent_train.example.txt
+"""
+import re
+import unicodedata
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+# loadgen.py / rasa-test-ui 와 같은 ground truth 표기
+GROUND_TRUTH_RE = re.compile(r"--([a-zA-Z0-9_]+)")
+
+_PRIME = np.uint64(0x100000001B3)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def load_labelled(path: str) -> Tuple[List[str], List[str]]:
+    """'문장 --intent' 줄들을 (문장들, 의도들) 로. 라벨 없는 줄은 건너뜀"""
+    texts, labels = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            match = GROUND_TRUTH_RE.search(line)
+            if not match:
+                continue
+            texts.append(GROUND_TRUTH_RE.sub("", line, count=1).strip())
+            labels.append(match.group(1))
+    return texts, labels
+
+
+def _normalize(text: str) -> str:
+    return " " + unicodedata.normalize("NFKC", text or "").lower().strip() + " "
+
+
+def featurize(messages: Sequence[str], bits: int, ngrams: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """배치 → 희소 행렬 좌표 (문장 번호, 특징 번호, 값). 특징 0 은 bias (모든 문장에 하나)"""
+    padded = [_normalize(m) for m in messages]
+    lengths = np.fromiter((len(p) for p in padded), dtype=np.int64, count=len(padded))
+    codes = np.frombuffer("".join(padded).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    ends = np.cumsum(lengths)
+    owner = np.repeat(np.arange(len(padded)), lengths)
+    n_buckets = (1 << bits) - 1
+    shift = np.uint64(64 - bits)
+
+    rows = [np.arange(len(padded))]
+    cols = [np.zeros(len(padded), dtype=np.int64)]
+    lo, hi = ngrams
+    for n in range(lo, hi + 1):
+        m = len(codes) - n + 1
+        if m <= 0:
+            continue
+        h = np.full(m, n, dtype=np.uint64)  # n 마다 다른 시작값
+        for k in range(n):
+            h = h * _PRIME + codes[k: k + m]  # uint64 오버플로는 그냥 감김 (의도된 동작)
+        start_owner = owner[:m]
+        valid = np.arange(m) + n <= ends[start_owner]  # 문장 경계를 넘는 n-gram 제외
+        idx = ((h[valid] * _MIX) >> shift).astype(np.int64) % n_buckets + 1
+        rows.append(start_owner[valid])
+        cols.append(idx)
+
+    row = np.concatenate(rows)
+    col = np.concatenate(cols)
+    counts = np.bincount(row, minlength=len(padded)).astype(np.float32)
+    val = (1.0 / np.sqrt(counts))[row]
+    return row, col, val
+
+
+class NgramIntentClassifier:
+    def __init__(
+        self,
+        intents: Sequence[str],
+        weights: np.ndarray,
+        bias: np.ndarray,
+        bits: int = 18,
+        ngrams: Tuple[int, int] = (2, 4),
+    ):
+        self.intents = list(intents)
+        self.W = weights  # (2^bits, C) float32
+        self.b = bias  # (C,)
+        self.bits = bits
+        self.ngrams = ngrams
+
+    # ---------------------------
+    # 추론
+    # ---------------------------
+    def _logits(self, row: np.ndarray, col: np.ndarray, val: np.ndarray, n: int) -> np.ndarray:
+        return _sparse_dot(row, self.W[col], val, n) + self.b
+
+    def probabilities(self, messages: Sequence[str]) -> np.ndarray:
+        if not messages:
+            return np.zeros((0, len(self.intents)), dtype=np.float32)
+        row, col, val = featurize(messages, self.bits, self.ngrams)
+        return _softmax(self._logits(row, col, val, len(messages)))
+
+    def predict(self, messages: Sequence[str]) -> List[Tuple[str, float]]:
+        probs = self.probabilities(messages)
+        best = probs.argmax(axis=1)
+        conf = probs[np.arange(len(best)), best]
+        return [(self.intents[i], float(p)) for i, p in zip(best, conf)]
+
+    def predict_one(self, message: str) -> Tuple[str, float]:
+        return self.predict([message])[0]
+
+    # ---------------------------
+    # 학습 (full-batch Adam + L2)
+    # ---------------------------
+    @classmethod
+    def train(
+        cls,
+        texts: Sequence[str],
+        labels: Sequence[str],
+        bits: int = 18,
+        ngrams: Tuple[int, int] = (2, 4),
+        epochs: int = 150,
+        lr: float = 0.1,
+        l2: float = 1e-5,
+    ) -> "NgramIntentClassifier":
+        if not texts:
+            raise ValueError("no labelled examples to train on")
+        intents = list(dict.fromkeys(labels))
+        y = np.array([intents.index(l) for l in labels])
+        n, c = len(texts), len(intents)
+        onehot = np.zeros((n, c), dtype=np.float32)
+        onehot[np.arange(n), y] = 1.0
+
+        row, col, val = featurize(texts, bits, ngrams)
+        used, col_local = np.unique(col, return_inverse=True)  # 실제로 나온 칸만 학습
+        model = cls(intents, np.zeros((1 << bits, c), dtype=np.float32), np.zeros(c, dtype=np.float32), bits, ngrams)
+        w = np.zeros((len(used), c), dtype=np.float32)
+        params = [w, model.b]
+        m1 = [np.zeros_like(p) for p in params]
+        m2 = [np.zeros_like(p) for p in params]
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+
+        for t in range(1, epochs + 1):
+            logits = _sparse_dot(row, w[col_local], val, n)
+            err = (_softmax(logits + model.b) - onehot) / n
+
+            gw = np.zeros_like(w)
+            np.add.at(gw, col_local, err[row] * val[:, None])
+            gw += l2 * w
+            grads = [gw, err.sum(axis=0)]
+            for p, g, a, s in zip(params, grads, m1, m2):
+                a *= beta1
+                a += (1 - beta1) * g
+                s *= beta2
+                s += (1 - beta2) * g * g
+                p -= lr * (a / (1 - beta1 ** t)) / (np.sqrt(s / (1 - beta2 ** t)) + eps)
+
+        model.W[used] = w
+        return model
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "NgramIntentClassifier":
+        texts, labels = load_labelled(path)
+        return cls.train(texts, labels, **kwargs)
+
+    def describe(self) -> dict:
+        return {
+            "engine": "ngram",
+            "intents": self.intents,
+            "buckets": 1 << self.bits,
+            "ngrams": list(self.ngrams),
+        }
+
+
+def _sparse_dot(row: np.ndarray, w_rows: np.ndarray, val: np.ndarray, n: int) -> np.ndarray:
+    """X @ W (X 는 좌표 형식). (문장, 클래스) 칸을 평탄화해서 bincount 한 번으로 더함"""
+    c = w_rows.shape[1]
+    flat = (row[:, None] * c + np.arange(c)).ravel()
+    out = np.bincount(flat, weights=(w_rows * val[:, None]).ravel(), minlength=n * c)
+    return out.reshape(n, c).astype(np.float32)
+
+
+def _softmax(z: np.ndarray) -> np.ndarray:
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+# ---------------------------
+# 벤치마크
+# ---------------------------
+def _bench() -> None:
+    import argparse
+    import random
+    import time
+
+    from intent_matcher import IntentMatcher
+    from mock_server import DEFAULT_INTENT, INTENT_KEYWORDS
+
+    parser = argparse.ArgumentParser(description="n-gram classifier vs keyword matcher")
+    parser.add_argument("train", help="'문장 --intent' 학습 파일")
+    parser.add_argument("--bits", type=int, default=18)
+    parser.add_argument("--epochs", type=int, default=150)
+    parser.add_argument("--messages", type=int, default=20000, help="처리할 총 메시지 수 (배치 크기마다)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    texts, labels = load_labelled(args.train)
+    t0 = time.perf_counter()
+    clf = NgramIntentClassifier.train(texts, labels, bits=args.bits, epochs=args.epochs)
+    train_s = time.perf_counter() - t0
+    matcher = IntentMatcher(INTENT_KEYWORDS, DEFAULT_INTENT)
+
+    # 학습 데이터 정확도 (키워드 매처와 비교)
+    pred = [p for p, _ in clf.predict(texts)]
+    acc_ngram = sum(p == l for p, l in zip(pred, labels)) / len(labels)
+    acc_kw = sum(matcher.pick(t) == l for t, l in zip(texts, labels)) / len(labels)
+    print(f"train: {len(texts)} examples, {len(clf.intents)} intents, {train_s * 1000:.0f} ms")
+    print(f"accuracy on training file: ngram {acc_ngram:.1%}  keyword {acc_kw:.1%}")
+
+    rng = random.Random(args.seed)
+    workload = [rng.choice(texts) for _ in range(args.messages)]
+
+    t0 = time.perf_counter()
+    for msg in workload:
+        matcher.pick(msg)
+    kw_s = time.perf_counter() - t0
+    print(f"{'engine':<16}{'batch':>7}{'msgs/s':>12}{'us/msg':>10}")
+    print(f"{'keyword':<16}{1:>7}{len(workload) / kw_s:>12,.0f}{kw_s / len(workload) * 1e6:>10.2f}")
+
+    for batch in (1, 64, 4096):
+        n = max(batch, (len(workload) // batch) * batch)
+        t0 = time.perf_counter()
+        for i in range(0, n, batch):
+            chunk = workload[i: i + batch] if i + batch <= len(workload) else [workload[0]] * batch
+            clf.predict(chunk)
+        el = time.perf_counter() - t0
+        print(f"{'ngram':<16}{batch:>7}{n / el:>12,.0f}{el / n * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    _bench()
@@ -0,0 +1,124 @@
+# replay_store.py
+"""
+응답 기록(record) / 재생(replay)
+
+기록 파일은 한 줄에 하나:
+    <정규화된 메시지 (JSON 문자열)>\t<{"p": payload, "r": response, "d": delay} JSON>\n
+- JSON 문자열 안의 탭은 항상 \\t 로 이스케이프되므로 첫 번째 탭이 곧 키/값 구분자
+- 기록: O_APPEND 로 한 줄을 write 한 번에 → 멀티 워커가 같은 파일에 써도 줄이 섞이지 않음
+- 재생: 파일을 mmap 하고 시작 시 (키 → 오프셋, 길이) 인덱스만 만든다 (값은 파싱하지 않음)
+  조회 시 해당 구간만 잘라 파싱하고, 결과는 LRU(+TTL) 캐시에 보관
+같은 키가 여러 번 기록돼 있으면 마지막 기록이 이긴다.
+"""
+import json
+import mmap
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_message(text: str) -> str:
+    """재생 키: NFKC + 소문자 + 공백 정리"""
+    return _WS.sub(" ", unicodedata.normalize("NFKC", text or "")).strip().lower()
+
+
+class RecordLog:
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self.records = 0
+
+    def append(self, payload: Dict[str, Any], response: Dict[str, Any], delay: float) -> None:
+        key = json.dumps(normalize_message(payload.get("message", "")), ensure_ascii=False)
+        value = json.dumps(
+            {"p": payload, "r": response, "d": round(delay, 4)},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        os.write(self._fd, f"{key}\t{value}\n".encode("utf-8"))
+        self.records += 1
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class ReplayStore:
+    def __init__(self, path: str, cache_size: int = 10000, ttl_s: float = 0.0):
+        self.path = path
+        self.cache_size = cache_size
+        self.ttl_s = ttl_s
+        self._cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        if self._mm is not None:
+            self._build_index()
+
+    def _build_index(self) -> None:
+        mm = self._mm
+        pos, end = 0, len(mm)
+        while pos < end:
+            nl = mm.find(b"\n", pos)
+            if nl == -1:
+                break  # 기록 중이던 마지막 줄 (불완전) 은 건너뜀
+            tab = mm.find(b"\t", pos, nl)
+            if tab != -1:
+                key = json.loads(mm[pos:tab])
+                self._index[key] = (tab + 1, nl - tab - 1)
+            pos = nl + 1
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, message: str) -> Optional[Dict[str, Any]]:
+        key = normalize_message(message)
+        now = time.monotonic()
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            expires_at, record = cached
+            if not self.ttl_s or expires_at > now:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return record
+            del self._cache[key]
+
+        loc = self._index.get(key)
+        if loc is None:
+            self.misses += 1
+            return None
+        off, length = loc
+        record = json.loads(self._mm[off: off + length])
+        self.hits += 1
+
+        self._cache[key] = (now + self.ttl_s, record)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+        return record
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "keys": len(self._index),
+            "cached": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        self._cache.clear()
+        if self._mm is not None:
+            self._mm.close()
+        self._file.close()
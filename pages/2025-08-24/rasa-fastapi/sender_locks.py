@@ -0,0 +1,125 @@
+# sender_locks.py
+"""
+sender 별 직렬 처리 (Rasa lock store 흉내)
+
+실제 Rasa 는 한 sender 의 메시지를 도착 순서대로 하나씩 처리하고, 다른 sender 끼리는 병렬로 돈다.
+- sender 마다 asyncio.Lock (FIFO 라 도착 순서 보장) + 대기 시간 통계
+- sender 해시로 shard 를 나누고, shard 마다 OrderedDict 를 마지막 사용 순서로 유지
+  * 쓰는 쪽(잡고 있거나 기다리는 요청)이 없고 idle_ttl_s 넘게 쉰 락은 앞에서부터 제거
+  * shard 당 최대 개수를 넘으면 쉬고 있는 것 중 가장 오래된 것부터 제거
+  정리는 해당 shard 에 접근할 때만 하므로 비용이 shard 크기로 묶인다.
+워커마다 따로 가지므로 멀티 워커에서는 같은 sender 가 다른 워커로 가면 직렬화되지 않는다.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class SenderLock:
+    __slots__ = ("sender", "lock", "users", "last_used", "turns", "waited", "total_wait_s", "max_wait_s")
+
+    def __init__(self, sender: str, now: float):
+        self.sender = sender
+        self.lock = asyncio.Lock()
+        self.users = 0  # 잡고 있거나 기다리는 요청 수
+        self.last_used = now
+        self.turns = 0
+        self.waited = 0  # 기다려야 했던 횟수
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sender": self.sender,
+            "locked": self.lock.locked(),
+            "queued": max(0, self.users - 1) if self.lock.locked() else self.users,
+            "turns": self.turns,
+            "waited": self.waited,
+            "total_wait_s": round(self.total_wait_s, 4),
+            "mean_wait_s": round(self.total_wait_s / self.turns, 4) if self.turns else 0.0,
+            "max_wait_s": round(self.max_wait_s, 4),
+        }
+
+
+class SenderLocks:
+    def __init__(self, shards: int = 64, idle_ttl_s: float = 60.0, max_per_shard: int = 2000):
+        self.n_shards = shards
+        self.idle_ttl_s = idle_ttl_s
+        self.max_per_shard = max_per_shard
+        self._shards: List["OrderedDict[str, SenderLock]"] = [OrderedDict() for _ in range(shards)]
+        self.expired = 0
+
+    def _shard(self, sender: str) -> "OrderedDict[str, SenderLock]":
+        return self._shards[hash(sender) % self.n_shards]
+
+    def __len__(self) -> int:
+        return sum(len(s) for s in self._shards)
+
+    def get(self, sender: str) -> Optional[SenderLock]:
+        return self._shard(sender).get(sender)
+
+    def _expire(self, shard: "OrderedDict[str, SenderLock]", now: float) -> None:
+        cutoff = now - self.idle_ttl_s
+        while shard:
+            entry = next(iter(shard.values()))
+            if entry.users or entry.last_used >= cutoff:
+                break
+            shard.popitem(last=False)
+            self.expired += 1
+
+        if len(shard) > self.max_per_shard:
+            # 쓰는 중인 락은 건드리지 않음 (모두 사용 중이면 잠시 넘치도록 둔다)
+            for sender in [s for s, e in shard.items() if not e.users][: len(shard) - self.max_per_shard]:
+                del shard[sender]
+                self.expired += 1
+
+    async def acquire(self, sender: str) -> Tuple[SenderLock, float]:
+        """차례가 올 때까지 기다림. (엔트리, 기다린 초)"""
+        now = time.monotonic()
+        shard = self._shard(sender)
+        entry = shard.get(sender)
+        if entry is None:
+            entry = SenderLock(sender, now)
+            shard[sender] = entry
+        else:
+            shard.move_to_end(sender)
+        entry.users += 1
+        self._expire(shard, now)
+
+        t0 = time.perf_counter()
+        try:
+            await entry.lock.acquire()
+        except BaseException:
+            entry.users -= 1
+            raise
+        wait = time.perf_counter() - t0
+        entry.turns += 1
+        entry.total_wait_s += wait
+        if wait > 0.0005:
+            entry.waited += 1
+        entry.max_wait_s = max(entry.max_wait_s, wait)
+        return entry, wait
+
+    def release(self, entry: SenderLock) -> None:
+        entry.users -= 1
+        entry.last_used = time.monotonic()
+        entry.lock.release()
+
+    def top_waiting(self, n: int = 10) -> List[Dict[str, Any]]:
+        """누적 대기 시간이 긴 sender (살아 있는 락 중에서)"""
+        entries = [e for shard in self._shards for e in shard.values() if e.waited]
+        entries.sort(key=lambda e: e.total_wait_s, reverse=True)
+        return [e.to_dict() for e in entries[:n]]
+
+    def stats(self) -> Dict[str, Any]:
+        live = [e for shard in self._shards for e in shard.values()]
+        return {
+            "locks": len(live),
+            "held": sum(1 for e in live if e.lock.locked()),
+            "queued": sum(max(0, e.users - 1) for e in live if e.lock.locked()),
+            "shards": self.n_shards,
+            "idle_ttl_s": self.idle_ttl_s,
+            "max_per_shard": self.max_per_shard,
+            "expired": self.expired,
+        }
@@ -0,0 +1,138 @@
+# sessions.py
+"""
+sender 별 대화 상태 (Rasa tracker 흉내)
+
+- Session 은 __slots__ 레코드, 슬롯 이름은 sys.intern 으로 공유
+- OrderedDict 를 마지막 접근 순서로 유지 → 앞쪽이 항상 가장 오래 쉰 세션
+  * idle TTL: 앞에서부터 만료된 것만 잘라냄 (접근당 상각 O(1))
+  * 최대 개수: 넘치면 가장 오래된 것부터 제거
+수백만 sender 를 흘려도 메모리는 max_size 개 세션으로 묶인다.
+워커마다 따로 가지므로 멀티 워커에서 같은 sender 가 다른 워커로 가면 상태가 갈린다.
+"""
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+class Session:
+    __slots__ = ("sender", "flow", "prev_flow", "turns", "slots", "last_seen")
+
+    def __init__(self, sender: str, now: float):
+        self.sender = sender
+        self.flow: Optional[str] = None
+        self.prev_flow: Optional[str] = None
+        self.turns = 0
+        self.slots: Optional[Dict[str, str]] = None  # 필요할 때만 dict 생성
+        self.last_seen = now
+
+    def set_slot(self, name: str, value: Any) -> None:
+        if self.slots is None:
+            self.slots = {}
+        self.slots[sys.intern(name)] = value if isinstance(value, str) else str(value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sender": self.sender,
+            "current_flow": self.flow,
+            "previous_flow": self.prev_flow,
+            "turn_count": self.turns,
+            "slots": dict(self.slots or {}),
+            "idle_s": round(time.monotonic() - self.last_seen, 3),
+        }
+
+
+class SessionStore:
+    def __init__(
+        self,
+        max_size: int = 100_000,
+        idle_ttl_s: float = 1800.0,
+        on_evict: Optional[Callable[[str, int], None]] = None,
+    ):
+        self.max_size = max_size
+        self.idle_ttl_s = idle_ttl_s
+        self.on_evict = on_evict
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self.evicted_ttl = 0
+        self.evicted_size = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, sender: str) -> Optional[Session]:
+        return self._sessions.get(sender)
+
+    def _expire(self, now: float) -> None:
+        sessions = self._sessions
+        n = 0
+        if self.idle_ttl_s > 0:
+            cutoff = now - self.idle_ttl_s
+            while sessions:
+                oldest = next(iter(sessions.values()))
+                if oldest.last_seen >= cutoff:
+                    break
+                sessions.popitem(last=False)
+                n += 1
+            if n:
+                self.evicted_ttl += n
+                if self.on_evict:
+                    self.on_evict("ttl", n)
+
+        n = 0
+        while len(sessions) > self.max_size:
+            sessions.popitem(last=False)
+            n += 1
+        if n:
+            self.evicted_size += n
+            if self.on_evict:
+                self.on_evict("size", n)
+
+    def advance(self, sender: str, intent: str, slots: Optional[Dict[str, Any]] = None) -> Session:
+        """한 턴 진행: 현재 flow 갱신 + (있으면) 슬롯 값 반영"""
+        now = time.monotonic()
+        sess = self._sessions.get(sender)
+        if sess is None:
+            sess = Session(sender, now)
+            self._sessions[sender] = sess
+        else:
+            self._sessions.move_to_end(sender)
+            sess.last_seen = now
+
+        sess.prev_flow = sess.flow
+        sess.flow = sys.intern(intent)
+        sess.turns += 1
+        if slots:
+            for name, value in slots.items():
+                sess.set_slot(name, value)
+
+        self._expire(now)
+        return sess
+
+    def bytes_per_session(self, sample: int = 200) -> Optional[float]:
+        """최근 세션 일부를 샘플링해 세션당 대략적인 메모리 (레코드 + 슬롯 dict + sender 문자열)"""
+        if not self._sessions:
+            return None
+        total = 0
+        n = 0
+        for sess in reversed(self._sessions.values()):
+            size = sys.getsizeof(sess) + sys.getsizeof(sess.sender)
+            if sess.slots is not None:
+                size += sys.getsizeof(sess.slots)
+                size += sum(sys.getsizeof(v) for v in sess.slots.values())
+            total += size
+            n += 1
+            if n >= sample:
+                break
+        # OrderedDict 엔트리 자체 비용 (키 포인터 + 링크드 리스트 노드) 근사치
+        per_entry = sys.getsizeof(self._sessions) / max(1, len(self._sessions))
+        return round(total / n + per_entry, 1)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "max_size": self.max_size,
+            "idle_ttl_s": self.idle_ttl_s,
+            "evicted_ttl": self.evicted_ttl,
+            "evicted_size": self.evicted_size,
+            "approx_bytes_per_session": self.bytes_per_session(),
+        }
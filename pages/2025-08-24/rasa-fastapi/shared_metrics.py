@@ -0,0 +1,169 @@
+# shared_metrics.py
+"""
+워커 간 공유 메트릭 (multiprocessing.shared_memory)
+
+uvicorn --workers N 으로 띄우면 워커마다 METRICS 가 따로 생겨서
+/health, /metrics 가 워커 하나의 숫자만 보여준다. 그래서:
+
+- 런처(부모)가 공유 메모리 세그먼트를 하나 만들고 이름을 환경변수로 넘긴다
+    [pid 헤더 x max_slots][슬롯 0: int64 x n_fields][슬롯 1] ...
+- 각 워커는 시작 시 빈 슬롯 하나를 잡아서 레지스트리의 values 를 그 슬롯으로 바꿔 끼운다
+  → 갱신 경로는 그대로 "자기 슬롯 원소 += 1" (락 없음, 쓰는 프로세스가 하나뿐)
+- 읽을 때만 모든 슬롯을 더한다
+
+죽은 워커 슬롯은 재사용하되 누적 카운터는 유지하고 게이지(in-flight 등)만 0으로 되돌린다.
+슬롯 점유는 fcntl 파일 락으로 직렬화 (POSIX 전용; 그 외 환경은 워커별 값만 보임).
+"""
+import os
+import tempfile
+from multiprocessing import shared_memory
+from typing import List, Optional
+
+from metrics import MetricsRegistry
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+ENV_NAME = "MOCK_SHM_NAME"
+ENV_SLOTS = "MOCK_SHM_SLOTS"
+ENV_FIELDS = "MOCK_SHM_FIELDS"
+ITEM = 8  # int64
+
+
+def _lock_path(name: str) -> str:
+    return os.path.join(tempfile.gettempdir(), f"{name}.lock")
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # uvicorn 워커는 spawn 으로 떠서 부모의 resource_tracker 를 같이 쓰므로
+    # 따로 등록 해제할 필요 없음. 3.13+ 에서는 아예 추적하지 않게 한다.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SharedSegment:
+    """부모 프로세스 쪽: 세그먼트 생성/정리"""
+
+    def __init__(self, n_fields: int, max_slots: int):
+        self.n_fields = n_fields
+        self.max_slots = max_slots
+        size = ITEM * (max_slots + max_slots * n_fields)
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.shm.buf[:size] = bytes(size)
+        open(_lock_path(self.shm.name), "a").close()
+
+        os.environ[ENV_NAME] = self.shm.name
+        os.environ[ENV_SLOTS] = str(max_slots)
+        os.environ[ENV_FIELDS] = str(n_fields)
+
+    def close(self) -> None:
+        name = self.shm.name
+        try:
+            self.shm.close()
+        except BufferError:
+            # 워커 1개 모드에서는 같은 프로세스에 살아있는 view 가 남아 있을 수 있음
+            pass
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+        try:
+            os.remove(_lock_path(name))
+        except OSError:
+            pass
+
+
+class SharedMetrics:
+    """워커 쪽: 슬롯 하나를 잡고 레지스트리를 공유 메모리로 연결"""
+
+    def __init__(self, registry: MetricsRegistry, name: str, max_slots: int, n_fields: int):
+        if n_fields != len(registry.values):
+            raise RuntimeError(
+                f"shared metrics layout mismatch: segment has {n_fields} fields, "
+                f"registry has {len(registry.values)}"
+            )
+        self.registry = registry
+        self.max_slots = max_slots
+        self.n_fields = n_fields
+        self.shm = _attach(name)
+        self._pids = self.shm.buf[: ITEM * max_slots].cast("q")
+        self.slot = self._claim(name)
+
+        start = ITEM * (max_slots + self.slot * n_fields)
+        own = self.shm.buf[start: start + ITEM * n_fields].cast("q")
+        registry.values = own
+        registry.snapshot = self.snapshot  # 읽기는 전체 슬롯 합
+
+    def _slot_view(self, i: int) -> memoryview:
+        start = ITEM * (self.max_slots + i * self.n_fields)
+        return self.shm.buf[start: start + ITEM * self.n_fields].cast("q")
+
+    def _claim(self, name: str) -> int:
+        lock = open(_lock_path(name), "a")
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            me = os.getpid()
+            free: Optional[int] = None
+            for i in range(self.max_slots):
+                pid = self._pids[i]
+                if pid == 0:
+                    free = i
+                    break
+                if free is None and not _pid_alive(pid):
+                    free = i
+            if free is None:
+                raise RuntimeError(f"no free shared metrics slot (max {self.max_slots})")
+            if self._pids[free] != 0:
+                # 죽은 워커 자리: 누적값은 남기고 게이지만 초기화
+                view = self._slot_view(free)
+                for off in self.registry.gauge_offsets():
+                    view[off] = 0
+            self._pids[free] = me
+            return free
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+            lock.close()
+
+    def snapshot(self) -> List[int]:
+        total = [0] * self.n_fields
+        for i in range(self.max_slots):
+            if self._pids[i] == 0:
+                continue
+            view = self._slot_view(i)
+            for j, v in enumerate(view):
+                total[j] += v
+        return total
+
+    def live_workers(self) -> int:
+        pids = {self._pids[i] for i in range(self.max_slots)}
+        pids.discard(0)
+        return sum(1 for pid in pids if _pid_alive(pid))
+
+
+def attach_from_env(registry: MetricsRegistry) -> Optional[SharedMetrics]:
+    """런처가 세그먼트를 만들어 둔 경우에만 연결 (uvicorn 직접 실행 시에는 None)"""
+    name = os.getenv(ENV_NAME)
+    if not name:
+        return None
+    return SharedMetrics(
+        registry,
+        name,
+        int(os.environ[ENV_SLOTS]),
+        int(os.environ[ENV_FIELDS]),
+    )
@@ -0,0 +1,132 @@
+# traces.py
+"""
+최근 요청 트레이스 링 버퍼 (/debug/traces)
+
+부하 테스트에서 NG 나 지연 튀는 구간이 보이면, 클라이언트 쪽 echo 말고 서버 쪽 기록으로 되짚어 보려고.
+- 최근 capacity 개만 유지. 필드마다 array 하나씩 (열 단위), 시작할 때 전부 할당해 두고 덮어쓴다.
+  sender 는 문자열 참조만 미리 만든 리스트 칸에 넣음 (복사 없음)
+- 의도 / 라우트 이름은 번호로 바꿔 저장 (종류가 몇 개 안 됨)
+- 메시지는 본문 대신 crc32 (클라이언트 쪽에서도 같은 값을 계산해 맞춰볼 수 있음)
+- 기록은 칸 몇 개 대입이 전부. 필터 / 정렬 / dict 변환은 조회할 때만
+- 조회는 최신부터. seq(누적 번호) 를 커서로 써서 before=<다음 페이지 seq> 로 넘김
+  (기록이 계속 들어와도 페이지가 밀리지 않음, 링에서 밀려난 건 사라짐)
+워커마다 따로 가진다.
+"""
+import time
+import zlib
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+PERTURBED = 1
+REPLAYED = 2
+
+
+class TraceRing:
+    def __init__(self, capacity: int = 10000):
+        self.capacity = capacity
+        self.ts = array("d", bytes(8 * capacity))
+        self.msg_hash = array("I", bytes(4 * capacity))
+        self.delay = array("f", bytes(4 * capacity))
+        self.elapsed = array("f", bytes(4 * capacity))
+        self.req_bytes = array("Q", bytes(8 * capacity))
+        self.resp_bytes = array("Q", bytes(8 * capacity))
+        self.intent_ids = array("H", bytes(2 * capacity))
+        self.route_ids = array("H", bytes(2 * capacity))
+        self.flags = array("B", bytes(capacity))
+        self.senders: List[Optional[str]] = [None] * capacity
+        self.names: List[str] = []
+        self._name_index: Dict[str, int] = {}
+        self.written = 0
+
+    def _id(self, name: str) -> int:
+        i = self._name_index.get(name)
+        if i is None:
+            i = self._name_index[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+    def record(
+        self,
+        route: str,
+        sender: Optional[str],
+        message: Optional[str],
+        intent: str,
+        flags: int,
+        delay: float,
+        elapsed: float,
+        req_bytes: int,
+        resp_bytes: int,
+    ) -> None:
+        row = self.written % self.capacity
+        self.ts[row] = time.time()
+        self.senders[row] = sender
+        self.msg_hash[row] = zlib.crc32(message.encode("utf-8")) if message else 0
+        self.intent_ids[row] = self._id(intent)
+        self.route_ids[row] = self._id(route)
+        self.flags[row] = flags
+        self.delay[row] = delay
+        self.elapsed[row] = elapsed
+        self.req_bytes[row] = req_bytes
+        self.resp_bytes[row] = resp_bytes
+        self.written += 1
+
+    def _row_dict(self, seq: int) -> Dict[str, Any]:
+        row = seq % self.capacity
+        flags = self.flags[row]
+        return {
+            "seq": seq,
+            "ts": self.ts[row],
+            "route": self.names[self.route_ids[row]],
+            "sender": self.senders[row],
+            "message_crc32": f"{self.msg_hash[row]:08x}",
+            "intent": self.names[self.intent_ids[row]],
+            "perturbed": bool(flags & PERTURBED),
+            "replayed": bool(flags & REPLAYED),
+            "delay_ms": round(self.delay[row] * 1000, 3),
+            "elapsed_ms": round(self.elapsed[row] * 1000, 3),
+            "request_bytes": self.req_bytes[row],
+            "response_bytes": self.resp_bytes[row],
+        }
+
+    def query(
+        self,
+        sender: Optional[str] = None,
+        intent: Optional[str] = None,
+        route: Optional[str] = None,
+        min_ms: float = 0.0,
+        perturbed: Optional[bool] = None,
+        before: Optional[int] = None,
+        limit: int = 50,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """최신부터 조건에 맞는 것 limit 개. (트레이스들, 다음 페이지 before 값 — 끝이면 None)"""
+        oldest = max(0, self.written - self.capacity)
+        seq = self.written if before is None else min(before, self.written)
+        # 없는 이름이면 -1 → 아무것도 안 맞음
+        intent_id = self._name_index.get(intent, -1) if intent is not None else None
+        route_id = self._name_index.get(route, -1) if route is not None else None
+        min_s = min_ms / 1000.0
+
+        out: List[Dict[str, Any]] = []
+        while seq > oldest and len(out) < limit:
+            seq -= 1
+            row = seq % self.capacity
+            if sender is not None and self.senders[row] != sender:
+                continue
+            if intent_id is not None and self.intent_ids[row] != intent_id:
+                continue
+            if route_id is not None and self.route_ids[row] != route_id:
+                continue
+            if min_s and self.elapsed[row] < min_s:
+                continue
+            if perturbed is not None and bool(self.flags[row] & PERTURBED) != perturbed:
+                continue
+            out.append(self._row_dict(seq))
+        return out, (seq if seq > oldest else None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "written": self.written,
+            "held": min(self.written, self.capacity),
+            "oldest_seq": max(0, self.written - self.capacity),
+        }